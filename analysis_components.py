@@ -2,15 +2,17 @@
 Analysis components — levels, money-flow, multi-TF trend, scenarios.
 Completely rewritten to use real indicators from indicators.py.
 """
-from typing import Dict, List, Tuple
-from datetime import datetime
-import pytz
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple
+import time
 
 import config
 from indicators import (
-    sma_last, ema_last, rsi_last, macd_last, bb_last,
-    atr_last, stochastic_last, adx, obv_trend,
-    volume_ratio, is_volume_spike, volume_trend, vwap, compute_all,
+    ema_last, bb_last,
+    atr_last, stochastic_last, obv_trend,
+    volume_sma, volume_ratio, is_volume_spike, volume_trend, vwap, compute_all,
+    compute_raw,
 )
 from patterns import detect_patterns
 
@@ -20,61 +22,116 @@ from patterns import detect_patterns
 # ═══════════════════════════════════════════════════════════════════════════
 
 def _cluster_levels(prices: List[float], tolerance: float) -> List[Tuple[float, int]]:
-    """Return (level_price, touch_count) clusters."""
+    """
+    Return (level_price, touch_count) clusters.
+
+    Each cluster starts at its lowest price and absorbs every price within
+    *tolerance* of it.  The cluster boundary is located with a binary search
+    over the sorted prices and the cluster sum is read off a running-sum
+    array built once up front, so per-cluster work is one bisect and one
+    subtraction.  Clusters are returned in ascending price
+    order.
+    """
     if not prices:
         return []
-    sorted_p = sorted(prices)
+    return _cluster_sorted(sorted(prices), tolerance)
+
+
+def _cluster_sorted(sorted_p: List[float], tolerance: float) -> List[Tuple[float, int]]:
+    """_cluster_levels for input that is already in ascending order."""
+    min_touches = config.MIN_TOUCHES
+    running = list(accumulate(sorted_p, initial=0.0))
+    n = len(sorted_p)
     clusters: List[Tuple[float, int]] = []
     i = 0
-    while i < len(sorted_p):
-        group = [sorted_p[i]]
-        j = i + 1
-        while j < len(sorted_p) and (sorted_p[j] - sorted_p[i]) / sorted_p[i] <= tolerance:
-            group.append(sorted_p[j])
-            j += 1
-        if len(group) >= config.MIN_TOUCHES:
-            clusters.append((sum(group) / len(group), len(group)))
-        i = j if j > i + 1 else i + 1
+    while i < n:
+        head = sorted_p[i]
+        j = bisect_right(sorted_p, head * (1 + tolerance), i + 1)
+        count = j - i
+        if count >= min_touches:
+            clusters.append(((running[j] - running[i]) / count, count))
+        i = j
     return clusters
 
 
-def find_key_levels(ohlcv: Dict, lookback: int = None) -> Dict:
+def _histogram_levels(prices: List[float], tolerance: float) -> List[Tuple[float, int]]:
+    """
+    Single-pass alternative to _cluster_levels (no sort).
+
+    Prices are bucketed into fixed-width bins of ``tolerance × mean price``;
+    bins with at least MIN_TOUCHES members become levels at the mean price of
+    their members.  Bin edges are fixed, so a tight cluster straddling an
+    edge is split in two.  Enabled with ``config.LEVEL_METHOD = "histogram"``.
+    """
+    if not prices:
+        return []
+    min_touches = config.MIN_TOUCHES
+    lo = min(prices)
+    width = tolerance * sum(prices) / len(prices)
+    if width <= 0:
+        return [(lo, len(prices))] if len(prices) >= min_touches else []
+
+    counts: Dict[int, int] = {}
+    sums: Dict[int, float] = {}
+    for p in prices:
+        b = int((p - lo) / width)
+        counts[b] = counts.get(b, 0) + 1
+        sums[b] = sums.get(b, 0.0) + p
+    return [
+        (sums[b] / counts[b], counts[b])
+        for b in sorted(counts)
+        if counts[b] >= min_touches
+    ]
+
+
+def find_key_levels(ohlcv: Dict, lookback: int = None,
+                    ind: Optional[Dict] = None) -> Dict:
     """
     Identify support / resistance with touch counts, and
     classify levels by proximity to current price.
+
+    *ind* is an optional compute_raw() result for the same data; its ATR is
+    reused instead of being recomputed.
     """
     lookback = lookback or config.LEVEL_LOOKBACK
     highs = ohlcv["high"][-lookback:]
     lows = ohlcv["low"][-lookback:]
-    closes = ohlcv["close"][-lookback:]
-    volumes = ohlcv["volume"][-lookback:]
-    current = closes[-1]
+    current = ohlcv["close"][-1]
+    range_high = max(highs)
+    range_low = min(lows)
 
     tol = config.CLUSTER_TOLERANCE
 
     # Resistance from highs; support from lows
-    res_clusters = _cluster_levels(highs, tol)
-    sup_clusters = _cluster_levels(lows, tol)
-
-    # Sort by distance from current price
-    resistances = sorted(
-        [(lvl, tc) for lvl, tc in res_clusters if lvl > current * (1 + tol * 0.5)],
-        key=lambda x: x[0],
-    )
-    supports = sorted(
-        [(lvl, tc) for lvl, tc in sup_clusters if lvl < current * (1 - tol * 0.5)],
-        key=lambda x: x[0],
-        reverse=True,
-    )
+    cluster = _histogram_levels if config.LEVEL_METHOD == "histogram" else _cluster_levels
+    res_clusters = cluster(highs, tol)
+    sup_clusters = cluster(lows, tol)
+
+    _atr = ind["atr"] if ind else atr_last(ohlcv["high"], ohlcv["low"], ohlcv["close"])
+    return _classify_levels(current, res_clusters, sup_clusters,
+                            range_high, range_low, _atr, tol)
+
+
+def _classify_levels(current: float,
+                     res_clusters: List[Tuple[float, int]],
+                     sup_clusters: List[Tuple[float, int]],
+                     range_high: float, range_low: float,
+                     _atr: float, tol: float) -> Dict:
+    """Pick R1/R2/S1/S2 from ascending clusters and build the levels dict."""
+    # Order by distance from current price — clusters already come out in
+    # ascending price order, so no re-sort is needed
+    res_floor = current * (1 + tol * 0.5)
+    sup_ceiling = current * (1 - tol * 0.5)
+    resistances = [(lvl, tc) for lvl, tc in res_clusters if lvl > res_floor]
+    supports = [(lvl, tc) for lvl, tc in sup_clusters if lvl < sup_ceiling]
+    supports.reverse()
 
     # Nearest + second levels
-    r1 = resistances[0] if resistances else (max(highs) * 1.02, 0)
+    r1 = resistances[0] if resistances else (range_high * 1.02, 0)
     r2 = resistances[1] if len(resistances) > 1 else (r1[0] * 1.03, 0)
-    s1 = supports[0] if supports else (min(lows) * 0.98, 0)
+    s1 = supports[0] if supports else (range_low * 0.98, 0)
     s2 = supports[1] if len(supports) > 1 else (s1[0] * 0.97, 0)
 
-    _atr = atr_last(ohlcv["high"], ohlcv["low"], ohlcv["close"])
-
     return {
         "current": round(current, 6),
         "r1": round(r1[0], 6),
@@ -87,10 +144,10 @@ def find_key_levels(ohlcv: Dict, lookback: int = None) -> Dict:
         "s2_touches": s2[1],
         "atr": round(_atr, 6),
         "atr_pct": round(_atr / current * 100, 2) if current else 0,
-        "range_high": round(max(highs), 6),
-        "range_low": round(min(lows), 6),
-        "range_position": round((current - min(lows)) / (max(highs) - min(lows)) * 100, 1)
-                          if max(highs) != min(lows) else 50.0,
+        "range_high": round(range_high, 6),
+        "range_low": round(range_low, 6),
+        "range_position": round((current - range_low) / (range_high - range_low) * 100, 1)
+                          if range_high != range_low else 50.0,
     }
 
 
@@ -98,74 +155,118 @@ def find_key_levels(ohlcv: Dict, lookback: int = None) -> Dict:
 # Multi-timeframe trend analysis
 # ═══════════════════════════════════════════════════════════════════════════
 
-def analyze_trend_mtf(ohlcv: Dict, ohlcv_1h: Dict, ohlcv_4h: Dict) -> Dict:
+def _cmp(a: float, b: float) -> int:
+    """-1 / 0 / +1 three-way comparison."""
+    return (a > b) - (a < b)
+
+
+# Direction / momentum codes: index into these tuples, ordered bearish → bullish
+DIRECTIONS = ("strong_down", "down", "sideways", "up", "strong_up")
+MOMENTUM_LEVELS = ("oversold", "bearish", "neutral", "bullish", "overbought")
+
+# Confluence contribution per code
+_DIRECTION_SCORES = (-1, -1, 0, 1, 1)
+_MOMENTUM_SCORES = (-0.5, -0.5, 0.0, 0.5, 0.5)
+
+
+def _classify_direction(fast_mid: int, mid_slow: int,
+                        px_fast: int, px_mid: int) -> int:
+    """Direction code from the signs of SMA9-SMA21, SMA21-SMA50,
+    price-SMA9 and price-SMA21."""
+    if fast_mid > 0 and mid_slow > 0 and px_fast > 0:
+        return 4  # strong_up
+    if fast_mid > 0 and px_mid > 0:
+        return 3  # up
+    if fast_mid < 0 and mid_slow < 0 and px_fast < 0:
+        return 0  # strong_down
+    if fast_mid < 0 and px_mid < 0:
+        return 1  # down
+    return 2  # sideways
+
+
+# Every combination of the four comparisons, indexed base-3 — classifying a
+# timeframe is then a single tuple lookup instead of a branch ladder.
+_DIRECTION_TABLE = tuple(
+    _classify_direction(a, b, c, d)
+    for a in (-1, 0, 1) for b in (-1, 0, 1) for c in (-1, 0, 1) for d in (-1, 0, 1)
+)
+
+# RSI < 30 oversold, < 45 bearish, > 55 bullish, > 70 overbought
+_RSI_LOW_BANDS = (30, 45)
+_RSI_HIGH_BANDS = (55, 70)
+
+
+def analyze_trend_mtf(ohlcv: Dict, ohlcv_1h: Dict, ohlcv_4h: Dict,
+                      ind: Optional[Dict] = None) -> Dict:
     """
     Comprehensive trend analysis across 3 time-frames.
     Returns direction, strength, and detailed per-TF data.
+
+    *ind* is an optional compute_raw() result for the primary timeframe, so
+    its SMAs / RSI / MACD / ADX are not computed a second time.
     """
 
-    def _single_tf(data: Dict, label: str) -> Dict:
-        c = data["close"]
-        h = data["high"]
-        l = data["low"]
-        current = c[-1]
-
-        sma9 = sma_last(c, config.SMA_FAST)
-        sma21 = sma_last(c, config.SMA_MID)
-        sma50 = sma_last(c, config.SMA_SLOW)
-        _rsi = rsi_last(c)
-        _macd = macd_last(c)
-        _adx = adx(h, l, c)
-
-        # Trend direction
-        if sma9 > sma21 > sma50 and current > sma9:
-            direction = "strong_up"
-        elif sma9 > sma21 and current > sma21:
-            direction = "up"
-        elif sma9 < sma21 < sma50 and current < sma9:
-            direction = "strong_down"
-        elif sma9 < sma21 and current < sma21:
-            direction = "down"
-        else:
-            direction = "sideways"
+    def _single_tf(data: Dict, label: str, ind: Optional[Dict] = None) -> Dict:
+        ind = ind or compute_raw(data, full=False)
+        current = ind["price"]
+
+        sma9 = ind["sma_fast"]
+        sma21 = ind["sma_mid"]
+        sma50 = ind["sma_slow"]
+        _rsi = ind["rsi"]
+        _macd = ind["macd"]
+        _adx = ind["adx"]
+
+        # Trend direction — table lookup on the four SMA / price comparisons
+        dir_code = _DIRECTION_TABLE[
+            (_cmp(sma9, sma21) + 1) * 27 + (_cmp(sma21, sma50) + 1) * 9
+            + (_cmp(current, sma9) + 1) * 3 + (_cmp(current, sma21) + 1)
+        ]
 
         # Momentum qualifier
-        if _rsi > 70:
-            momentum = "overbought"
-        elif _rsi < 30:
-            momentum = "oversold"
-        elif _rsi > 55:
-            momentum = "bullish"
-        elif _rsi < 45:
-            momentum = "bearish"
-        else:
-            momentum = "neutral"
+        mom_code = bisect_right(_RSI_LOW_BANDS, _rsi) + bisect_left(_RSI_HIGH_BANDS, _rsi)
 
         return {
             "tf": label,
-            "direction": direction,
-            "momentum": momentum,
+            "direction": DIRECTIONS[dir_code],
+            "direction_code": dir_code,
+            "momentum": MOMENTUM_LEVELS[mom_code],
+            "momentum_code": mom_code,
             "rsi": _rsi,
             "macd_hist": _macd["histogram"],
             "adx": _adx["adx"],
             "trend_strength": "strong" if _adx["adx"] > 25 else "weak",
         }
 
-    tf_primary = _single_tf(ohlcv, "primary")
-    tf_1h = _single_tf(ohlcv_1h, "1h")
-    tf_4h = _single_tf(ohlcv_4h, "4h")
+    def _skipped_tf(label: str) -> Dict:
+        return {
+            "tf": label,
+            "direction": "sideways",
+            "direction_code": 2,
+            "momentum": "neutral",
+            "momentum_code": 2,
+            "rsi": 50.0,
+            "macd_hist": 0.0,
+            "adx": 0.0,
+            "trend_strength": "weak",
+            "skipped": True,
+        }
+
+    tf_primary = _single_tf(ohlcv, "primary", ind)
+    if (config.MTF_FAST_PATH and tf_primary["direction"] == "sideways"
+            and tf_primary["momentum"] == "neutral"):
+        # Flat primary TF — skip the higher-TF passes and call it neutral
+        tf_1h = _skipped_tf("1h")
+        tf_4h = _skipped_tf("4h")
+    else:
+        tf_1h = _single_tf(ohlcv_1h, "1h")
+        tf_4h = _single_tf(ohlcv_4h, "4h")
 
     # Confluence score: +1 for each bullish signal, -1 for bearish
     score = 0
     for tf in (tf_primary, tf_1h, tf_4h):
-        if "up" in tf["direction"]:
-            score += 1
-        elif "down" in tf["direction"]:
-            score -= 1
-        if tf["momentum"] in ("bullish", "overbought"):
-            score += 0.5
-        elif tf["momentum"] in ("bearish", "oversold"):
-            score -= 0.5
+        score += _DIRECTION_SCORES[tf["direction_code"]]
+        score += _MOMENTUM_SCORES[tf["momentum_code"]]
 
     if score >= 2:
         overall = "bullish"
@@ -191,28 +292,45 @@ def analyze_trend_mtf(ohlcv: Dict, ohlcv_1h: Dict, ohlcv_4h: Dict) -> Dict:
 # Money flow / Volume analysis
 # ═══════════════════════════════════════════════════════════════════════════
 
-def analyze_money_flow(ohlcv: Dict, ohlcv_1h: Dict, ohlcv_4h: Dict) -> Dict:
-    """Real money-flow analysis using volume, OBV, VWAP."""
+def analyze_money_flow(ohlcv: Dict, ohlcv_1h: Dict, ohlcv_4h: Dict,
+                       ind: Optional[Dict] = None) -> Dict:
+    """
+    Real money-flow analysis using volume, OBV, VWAP.
+
+    *ind* is an optional compute_raw() result for *ohlcv*; its VWAP, OBV and
+    volume stats are reused instead of being recomputed.
+    """
     c = ohlcv["close"]
-    h = ohlcv["high"]
-    l = ohlcv["low"]
     v = ohlcv["volume"]
     current = c[-1]
 
-    _vwap = vwap(h, l, c, v)
-    _obv = obv_trend(c, v)
-    _vol_ratio = volume_ratio(v)
-    _vol_trend = volume_trend(v)
-    _vol_spike = is_volume_spike(v)
+    if ind:
+        _vwap = ind["vwap"]
+        _obv = ind["obv_trend"]
+        _vol_ratio = ind["vol_ratio"]
+        _vol_trend = ind["vol_trend"]
+        _vol_spike = ind["vol_spike"]
+    else:
+        avg_vol = volume_sma(v)
+        _vwap = vwap(ohlcv["high"], ohlcv["low"], c, v)
+        _obv = obv_trend(c, v)
+        _vol_ratio = volume_ratio(v, avg=avg_vol)
+        _vol_trend = volume_trend(v)
+        _vol_spike = is_volume_spike(v, avg=avg_vol)
 
     # Price vs VWAP tells us if buyers or sellers are in control
     price_vs_vwap = "above" if current > _vwap else "below"
 
-    # Buying / selling pressure from recent candles
-    buy_candles = sum(1 for i in range(-10, 0) if c[i] > ohlcv["open"][i])
+    # Buying / selling pressure from recent candles (one fused pass)
+    buy_candles = 0
+    buy_volume = sell_volume = 0.0
+    for ci, oi, vi in zip(c[-10:], ohlcv["open"][-10:], v[-10:]):
+        if ci > oi:
+            buy_candles += 1
+            buy_volume += vi
+        else:
+            sell_volume += vi
     sell_candles = 10 - buy_candles
-    buy_volume = sum(v[i] for i in range(-10, 0) if c[i] > ohlcv["open"][i])
-    sell_volume = sum(v[i] for i in range(-10, 0) if c[i] <= ohlcv["open"][i])
     total_recent_vol = buy_volume + sell_volume
 
     if total_recent_vol > 0:
@@ -251,6 +369,11 @@ def analyze_money_flow(ohlcv: Dict, ohlcv_1h: Dict, ohlcv_4h: Dict) -> Dict:
 # Scenario builder — data-driven
 # ═══════════════════════════════════════════════════════════════════════════
 
+def _fmt_price(x: float) -> str:
+    """Format a price to at most 6 decimals without a round() round-trip."""
+    return f"{x:.6f}".rstrip("0").rstrip(".")
+
+
 def build_scenarios(indicators: Dict, levels: Dict, trend: Dict,
                     flow: Dict, patterns: List[Dict]) -> List[Dict]:
     """Build IF/THEN scenarios grounded in indicator data."""
@@ -263,23 +386,23 @@ def build_scenarios(indicators: Dict, levels: Dict, trend: Dict,
 
     scenarios: List[Dict] = []
 
+    below_vwap = flow["price_vs_vwap"] == "below"
+    above_vwap = flow["price_vs_vwap"] == "above"
+    macd_hist = indicators["macd_hist"]
+
     # ---------- Bullish scenario ----------
-    bull_trigger_parts = []
-    bull_confluence = 0
-
-    if rsi_val < 45:
-        bull_trigger_parts.append(f"RSI ({rsi_val}) turns up from oversold zone")
-        bull_confluence += 1
-    if flow["price_vs_vwap"] == "below":
-        bull_trigger_parts.append("price reclaims VWAP")
-        bull_confluence += 1
-    if indicators["macd_hist"] < 0:
-        bull_trigger_parts.append("MACD histogram flips positive")
-        bull_confluence += 1
-
-    bull_target1 = round(current + atr_val * 1.5, 6)
+    rsi_low = rsi_val < 45
+    macd_neg = macd_hist < 0
+    bull_confluence = rsi_low + below_vwap + macd_neg
+    bull_trigger = (
+        (f"RSI ({rsi_val}) turns up from oversold zone + " if rsi_low else "")
+        + ("price reclaims VWAP + " if below_vwap else "")
+        + ("MACD histogram flips positive + " if macd_neg else "")
+    ).rstrip(" +")
+
+    bull_target1 = current + atr_val * 1.5
     bull_target2 = r1
-    bull_stop = round(current - atr_val * 1.0, 6)
+    bull_stop = current - atr_val * 1.0
     bull_rr = round((bull_target2 - current) / (current - bull_stop), 1) if current != bull_stop else 0
 
     prob = "high" if bull_confluence >= 2 and "bullish" in trend["overall"] else \
@@ -288,31 +411,29 @@ def build_scenarios(indicators: Dict, levels: Dict, trend: Dict,
     scenarios.append({
         "label": "BULLISH",
         "emoji": "🟢",
-        "trigger": " + ".join(bull_trigger_parts) if bull_trigger_parts else f"price holds above ${s1} and reclaims ${round(current + atr_val * 0.5, 2)}",
-        "target": f"${bull_target1} → ${bull_target2}",
-        "stop": f"${bull_stop}",
+        "trigger": bull_trigger or f"price holds above ${s1} and reclaims ${_fmt_price(current + atr_val * 0.5)}",
+        "target": f"${_fmt_price(bull_target1)} → ${bull_target2}",
+        "stop": f"${_fmt_price(bull_stop)}",
+        "target_price": bull_target2,
+        "stop_price": round(bull_stop, 6),
         "rr_ratio": bull_rr,
         "probability": prob,
         "confluence": bull_confluence,
     })
 
     # ---------- Bearish scenario ----------
-    bear_trigger_parts = []
-    bear_confluence = 0
-
-    if rsi_val > 55:
-        bear_trigger_parts.append(f"RSI ({rsi_val}) rolls over from overbought zone")
-        bear_confluence += 1
-    if flow["price_vs_vwap"] == "above":
-        bear_trigger_parts.append("price loses VWAP")
-        bear_confluence += 1
-    if indicators["macd_hist"] > 0:
-        bear_trigger_parts.append("MACD histogram flips negative")
-        bear_confluence += 1
-
-    bear_target1 = round(current - atr_val * 1.5, 6)
+    rsi_high = rsi_val > 55
+    macd_pos = macd_hist > 0
+    bear_confluence = rsi_high + above_vwap + macd_pos
+    bear_trigger = (
+        (f"RSI ({rsi_val}) rolls over from overbought zone + " if rsi_high else "")
+        + ("price loses VWAP + " if above_vwap else "")
+        + ("MACD histogram flips negative + " if macd_pos else "")
+    ).rstrip(" +")
+
+    bear_target1 = current - atr_val * 1.5
     bear_target2 = s1
-    bear_stop = round(current + atr_val * 1.0, 6)
+    bear_stop = current + atr_val * 1.0
     bear_rr = round(abs(current - bear_target2) / (bear_stop - current), 1) if bear_stop != current else 0
 
     prob_bear = "high" if bear_confluence >= 2 and "bearish" in trend["overall"] else \
@@ -321,9 +442,11 @@ def build_scenarios(indicators: Dict, levels: Dict, trend: Dict,
     scenarios.append({
         "label": "BEARISH",
         "emoji": "🔴",
-        "trigger": " + ".join(bear_trigger_parts) if bear_trigger_parts else f"price breaks below ${s1}",
-        "target": f"${bear_target1} → ${bear_target2}",
-        "stop": f"${bear_stop}",
+        "trigger": bear_trigger or f"price breaks below ${s1}",
+        "target": f"${_fmt_price(bear_target1)} → ${bear_target2}",
+        "stop": f"${_fmt_price(bear_stop)}",
+        "target_price": bear_target2,
+        "stop_price": round(bear_stop, 6),
         "rr_ratio": bear_rr,
         "probability": prob_bear,
         "confluence": bear_confluence,
@@ -335,7 +458,7 @@ def build_scenarios(indicators: Dict, levels: Dict, trend: Dict,
         "emoji": "🟡",
         "trigger": "price stays between S1 and R1 with low ADX",
         "target": f"Fade extremes: buy near ${s1}, sell near ${r1}",
-        "stop": f"Outside range by 1 ATR (${round(s1 - atr_val, 2)} / ${round(r1 + atr_val, 2)})",
+        "stop": f"Outside range by 1 ATR (${_fmt_price(s1 - atr_val)} / ${_fmt_price(r1 + atr_val)})",
         "rr_ratio": round((r1 - s1) / atr_val, 1) if atr_val else 0,
         "probability": "high" if indicators["adx"] < 20 else "medium" if indicators["adx"] < 25 else "low",
         "confluence": 1 if indicators["adx"] < 25 else 0,
@@ -349,10 +472,18 @@ def build_scenarios(indicators: Dict, levels: Dict, trend: Dict,
 # ═══════════════════════════════════════════════════════════════════════════
 
 def get_session_context() -> Dict:
-    """Detailed session context with expected volatility."""
-    now = datetime.now(pytz.UTC)
-    hour = now.hour
+    """
+    Detailed session context with expected volatility.
 
+    Looked up from _SESSION_TABLE, so the dict is shared between callers —
+    treat it as read-only.
+    """
+    # Epoch seconds are UTC, so the hour falls straight out of the clock
+    return _SESSION_TABLE[int(time.time() // 3600 % 24)]
+
+
+def _session_context_for_hour(hour: int) -> Dict:
+    """Session context for a given UTC hour."""
     sessions = []
     if 0 <= hour < 9:
         sessions.append("Asia")
@@ -404,3 +535,7 @@ def get_session_context() -> Dict:
         "hours_until_next": hours_until,
         "utc_hour": hour,
     }
+
+
+# The context depends only on the UTC hour: build all 24 once at import
+_SESSION_TABLE = tuple(_session_context_for_hour(h) for h in range(24))
@@ -13,12 +13,21 @@ for the Telegram bot context.
 import os
 import time
 import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import logging
+import orjson
 import requests
-from typing import Dict, List, Optional
+from collections import Counter, defaultdict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Iterator, List, Optional
 from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 
+import config
+from cache_manager import CacheManager
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
@@ -38,20 +47,53 @@ _HEADERS = {
     "Prefer": "return=representation",
 }
 
+# One keep-alive session for every Supabase call, so repeated requests reuse
+# the same TLS connection instead of re-handshaking each time.
+_SESSION = requests.Session()
+_SESSION.headers.update(_HEADERS)
+_ADAPTER = HTTPAdapter(
+    pool_connections=4, pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.2,
+                      status_forcelist=[429, 502, 503, 504],
+                      raise_on_status=False),
+)
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
+
 
 # ═══════════════════════════════════════════════════════════════════════════
 # Low-level Supabase REST helpers  (sync)
 # ═══════════════════════════════════════════════════════════════════════════
 
-def _post(table: str, data: dict) -> Optional[List[dict]]:
-    """INSERT into a table and return the created row(s)."""
+_URL_CACHE: Dict[str, str] = {}
+
+# Per-request override for writes whose response body is never read
+_PREFER_MINIMAL = {"Prefer": "return=minimal"}
+
+
+def _url(path: str) -> str:
+    """REST endpoint for a table (or ``rpc/<fn>``), built once per path."""
+    url = _URL_CACHE.get(path)
+    if url is None:
+        url = _URL_CACHE[path] = f"{SUPABASE_URL}/rest/v1/{path}"
+    return url
+
+
+def _post(table: str, data: dict, return_row: bool = True) -> Optional[List[dict]]:
+    """
+    INSERT into a table and return the created row(s).
+    With return_row=False the server sends no body and [] is returned.
+    """
+    if not SUPABASE_URL:
+        return None
     try:
-        r = requests.post(
-            f"{SUPABASE_URL}/rest/v1/{table}",
-            json=data, headers=_HEADERS, timeout=10,
+        r = _SESSION.post(
+            _url(table),
+            data=orjson.dumps(data), timeout=10,
+            headers=None if return_row else _PREFER_MINIMAL,
         )
         if r.status_code in (200, 201):
-            return r.json()
+            return orjson.loads(r.content) if return_row else []
         logger.error("Supabase POST %s → %s: %s", table, r.status_code, r.text[:300])
     except Exception as e:
         logger.error("Supabase POST %s error: %s", table, e)
@@ -60,10 +102,12 @@ def _post(table: str, data: dict) -> Optional[List[dict]]:
 
 def _patch(table: str, filters: str, data: dict) -> bool:
     """UPDATE rows matching filters."""
+    if not SUPABASE_URL:
+        return False
     try:
-        r = requests.patch(
-            f"{SUPABASE_URL}/rest/v1/{table}?{filters}",
-            json=data, headers=_HEADERS, timeout=10,
+        r = _SESSION.patch(
+            _url(table) + "?" + filters,
+            data=orjson.dumps(data), timeout=10, headers=_PREFER_MINIMAL,
         )
         return r.status_code in (200, 204)
     except Exception as e:
@@ -73,29 +117,109 @@ def _patch(table: str, filters: str, data: dict) -> bool:
 
 def _get(table: str, params: str = "") -> List[dict]:
     """SELECT from a table with optional query params."""
+    if not SUPABASE_URL:
+        return []
     try:
-        url = f"{SUPABASE_URL}/rest/v1/{table}"
+        url = _url(table)
         if params:
-            url += f"?{params}"
-        r = requests.get(url, headers=_HEADERS, timeout=10)
+            url += "?" + params
+        r = _SESSION.get(url, timeout=10)
         if r.status_code == 200:
-            return r.json()
+            return orjson.loads(r.content)
         logger.error("Supabase GET %s → %s: %s", table, r.status_code, r.text[:300])
     except Exception as e:
         logger.error("Supabase GET %s error: %s", table, e)
     return []
 
 
-def _rpc(fn_name: str, params: Optional[dict] = None) -> Optional[list]:
-    """Call a Supabase RPC function."""
+def _get_paged(table: str, params: str = "", page: int = 1000) -> Iterator[dict]:
+    """
+    Yield every row matching params, fetched *page* rows at a time via the
+    Range header — not capped by the server's max-rows, never held in full.
+    Pages are ordered by id unless params sets an order, so rows are not
+    skipped or repeated between requests.
+    """
+    if not SUPABASE_URL:
+        return
+    if "order=" not in params:
+        params = f"{params}&order=id" if params else "order=id"
+    url = _url(table) + "?" + params
+    start = 0
+    while True:
+        try:
+            r = _SESSION.get(url, timeout=10, headers={
+                "Range-Unit": "items",
+                "Range": f"{start}-{start + page - 1}",
+            })
+            if r.status_code not in (200, 206):
+                logger.error("Supabase GET %s → %s: %s", table, r.status_code, r.text[:300])
+                return
+            rows = orjson.loads(r.content)
+        except Exception as e:
+            logger.error("Supabase GET %s error: %s", table, e)
+            return
+        yield from rows
+        if len(rows) < page:
+            return
+        start += page
+
+
+def _count(table: str, params: str = "") -> int:
+    """Row count via a HEAD request — PostgREST returns it in Content-Range."""
+    if not SUPABASE_URL:
+        return 0
     try:
-        r = requests.post(
-            f"{SUPABASE_URL}/rest/v1/rpc/{fn_name}",
-            json=params or {}, headers=_HEADERS, timeout=10,
+        url = _url(table)
+        if params:
+            url += "?" + params
+        r = _SESSION.head(url, headers={"Prefer": "count=exact"}, timeout=10)
+        if r.status_code in (200, 206):
+            total = r.headers.get("Content-Range", "").rpartition("/")[2]
+            return int(total) if total.isdigit() else 0
+        logger.error("Supabase COUNT %s → %s", table, r.status_code)
+    except Exception as e:
+        logger.error("Supabase COUNT %s error: %s", table, e)
+    return 0
+
+
+# RPCs that returned 404 (not installed — see supabase_functions.sql) or
+# that cannot run against this schema; callers fall back to client-side
+# aggregation without retrying them every time.
+_MISSING_RPCS: set = set()
+
+# Postgres error codes that make an RPC permanently unusable here
+# (42P10: ON CONFLICT without a matching unique constraint, as in the first
+# log_analysis_v1 while it is still installed)
+_SCHEMA_ERRORS = ("42P10",)
+
+# on_error marker for callers that must tell a refused call from no answer
+_REJECTED = object()
+
+
+def _rpc(fn_name: str, params: Optional[dict] = None, on_error=None) -> Optional[list]:
+    """
+    Call a Supabase RPC function.  Returns on_error when the call was
+    refused — skipped as missing, or answered with an error status, which
+    means its transaction was rolled back — and None when no answer came.
+    """
+    if not SUPABASE_URL or fn_name in _MISSING_RPCS:
+        return on_error
+    try:
+        r = _SESSION.post(
+            _url("rpc/" + fn_name),
+            data=orjson.dumps(params or {}), timeout=10,
         )
         if r.status_code == 200:
-            return r.json()
+            return orjson.loads(r.content)
+        if r.status_code == 404:
+            _MISSING_RPCS.add(fn_name)
+            logger.warning("Supabase RPC %s not installed — using client-side fallback", fn_name)
+            return on_error
         logger.error("Supabase RPC %s → %s: %s", fn_name, r.status_code, r.text[:300])
+        if any(f'"{code}"' in r.text for code in _SCHEMA_ERRORS):
+            _MISSING_RPCS.add(fn_name)
+            logger.warning("Supabase RPC %s does not fit the schema — using client-side fallback", fn_name)
+        return on_error
     except Exception as e:
         logger.error("Supabase RPC %s error: %s", fn_name, e)
     return None
@@ -112,10 +236,6 @@ def log_analysis(user_id: Optional[int] = None, username: Optional[str] = None,
                  response_time_ms: int = 0, error: Optional[str] = None) -> Optional[int]:
     """Log a completed analysis to Supabase. Returns the analysis row ID."""
     try:
-        # ── Upsert user ──
-        if user_id:
-            _upsert_user(user_id, username, first_name)
-
         # ── Extract signal data ──
         score = signal.get("score", 0) if signal else None
         verdict = signal.get("verdict", "") if signal else None
@@ -134,23 +254,9 @@ def log_analysis(user_id: Optional[int] = None, username: Optional[str] = None,
         if scenarios:
             for sc in scenarios:
                 if sc.get("label") == "BULLISH":
-                    t = sc.get("target", "")
-                    parts = t.replace("$", "").split("→")
-                    if len(parts) >= 2:
-                        try: target_bull = float(parts[1].strip())
-                        except ValueError: pass
-                    s = sc.get("stop", "").replace("$", "").strip()
-                    try: stop_bull = float(s)
-                    except ValueError: pass
+                    target_bull, stop_bull = sc.get("target_price"), sc.get("stop_price")
                 elif sc.get("label") == "BEARISH":
-                    t = sc.get("target", "")
-                    parts = t.replace("$", "").split("→")
-                    if len(parts) >= 2:
-                        try: target_bear = float(parts[1].strip())
-                        except ValueError: pass
-                    s = sc.get("stop", "").replace("$", "").strip()
-                    try: stop_bear = float(s)
-                    except ValueError: pass
+                    target_bear, stop_bear = sc.get("target_price"), sc.get("stop_price")
 
         # ── Insert analysis row ──
         row = {
@@ -176,16 +282,11 @@ def log_analysis(user_id: Optional[int] = None, username: Optional[str] = None,
             "trend_overall": trend_overall,
             "flow_direction": flow_dir,
         }
-        result = _post("analyses", row)
-        if not result:
-            return None
-
-        analysis_id = result[0]["id"]
 
-        # ── Create accuracy tracking record ──
+        # ── Accuracy tracking record (analysis_id filled in on insert) ──
+        acc_row = None
         if price and price > 0 and verdict:
             acc_row = {
-                "analysis_id": analysis_id,
                 "symbol": symbol,
                 "verdict": verdict,
                 "score": score or 0,
@@ -196,7 +297,30 @@ def log_analysis(user_id: Optional[int] = None, username: Optional[str] = None,
                 "bull_stop": stop_bull,
                 "bear_stop": stop_bear,
             }
-            _post("signal_accuracy", acc_row)
+
+        # ── One round trip: user upsert + analysis + accuracy row ──
+        analysis_id = _rpc("log_analysis_v1", {
+            "p_telegram_id": user_id,
+            "p_username": username,
+            "p_first_name": first_name,
+            "p_analysis": row,
+            "p_accuracy": acc_row,
+        }, on_error=_REJECTED)
+        if analysis_id is not _REJECTED:
+            # No fallback when no answer came (timeout, dropped connection):
+            # the row may already have been written.
+            return analysis_id
+
+        if user_id:
+            _upsert_user(user_id, username, first_name)
+
+        result = _post("analyses", row)
+        if not result:
+            return None
+
+        analysis_id = result[0]["id"]
+        if acc_row:
+            _post("signal_accuracy", {"analysis_id": analysis_id, **acc_row}, return_row=False)
 
         return analysis_id
 
@@ -207,7 +331,7 @@ def log_analysis(user_id: Optional[int] = None, username: Optional[str] = None,
 
 def _upsert_user(user_id: int, username: Optional[str] = None, first_name: Optional[str] = None):
     """Create or update a user record in Supabase."""
-    now_iso = datetime.now(timezone.utc).isoformat()
+    now = datetime.now(timezone.utc)  # orjson serializes it as ISO 8601
     # Check if user exists
     existing = _get("bot_users", f"telegram_id=eq.{user_id}&select=id,total_analyses")
     if existing:
@@ -216,7 +340,7 @@ def _upsert_user(user_id: int, username: Optional[str] = None, first_name: Optio
         _patch("bot_users", f"telegram_id=eq.{user_id}", {
             "username": username,
             "first_name": first_name,
-            "last_seen": now_iso,
+            "last_seen": now,
             "total_analyses": new_count,
         })
     else:
@@ -225,10 +349,10 @@ def _upsert_user(user_id: int, username: Optional[str] = None, first_name: Optio
             "telegram_id": user_id,
             "username": username,
             "first_name": first_name,
-            "first_seen": now_iso,
-            "last_seen": now_iso,
+            "first_seen": now,
+            "last_seen": now,
             "total_analyses": 1,
-        })
+        }, return_row=False)
 
 
 def log_error(error_type: str = "analysis_error", details: str = "",
@@ -240,8 +364,9 @@ def log_error(error_type: str = "analysis_error", details: str = "",
             "symbol": symbol,
             "timeframe": timeframe,
             "error_type": error_type,
-            "error_message": str(details)[:500],
-        })
+            "error_message": details if isinstance(details, str) and len(details) <= 500
+                             else str(details)[:500],
+        }, return_row=False)
     except Exception:
         pass
 
@@ -255,14 +380,23 @@ def log_event(event_type: str, details: str = ""):
 # Async wrappers for the Telegram bot context
 # ═══════════════════════════════════════════════════════════════════════════
 
+# Supabase writes get their own small pool so a burst of logging queues up
+# here instead of filling the loop's default executor used by everything else.
+# Submitted without asyncio.to_thread's context copy: the bot sets no
+# context variables the writes would need.
+_WRITE_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="supabase-write")
+
+
 async def async_log_analysis(**kwargs) -> Optional[int]:
     """Non-blocking wrapper for log_analysis."""
-    return await asyncio.to_thread(log_analysis, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_WRITE_POOL, functools.partial(log_analysis, **kwargs))
 
 
 async def async_log_error(**kwargs):
     """Non-blocking wrapper for log_error."""
-    await asyncio.to_thread(log_error, **kwargs)
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(_WRITE_POOL, functools.partial(log_error, **kwargs))
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -275,102 +409,136 @@ ACCURACY_WINDOWS = {
     "24h": 86400,
 }
 
+# window → (checked, price, return, correct) column names
+_ACCURACY_COLS = {
+    name: (f"checked_{name}", f"price_{name}", f"return_{name}", f"correct_{name}")
+    for name in ACCURACY_WINDOWS
+}
+
+
+async def _fetch_current_prices(client, symbols) -> Dict[str, float]:
+    """
+    Current price per symbol.  One batch tickers request covers most
+    symbols; any it misses fall back to concurrent 1m OHLCV fetches.
+    """
+    prices = await client.fetch_last_prices(symbols)
+    symbols = [s for s in symbols if s not in prices]
+    if not symbols:
+        return prices
+
+    results = await client.fetch_ohlcv_many(symbols, "1m", limit=1)
+    for sym, ohlcv in results.items():
+        if not isinstance(ohlcv, BaseException) and ohlcv and ohlcv["close"]:
+            prices[sym] = ohlcv["close"][-1]
+    return prices
+
+
+def _flush_accuracy_updates(updates: List[dict]):
+    """Write a cycle's accuracy results in one RPC, or row by row without it."""
+    if _rpc("bulk_update_accuracy", {"payload": updates}) is not None:
+        return
+    for update in updates:
+        fields = {k: v for k, v in update.items() if k != "id"}
+        _patch("signal_accuracy", f"id=eq.{update['id']}", fields)
+
 
 async def check_signal_accuracy():
     """
     Background task: checks old signals against current prices.
     Runs every 5 minutes.
     """
-    from multi_exchange_client import MultiExchangeClient
+    from crypto_analyzer import get_client
 
     while True:
         try:
             await asyncio.sleep(300)  # 5 minutes
 
             now = datetime.now(timezone.utc)
+            cutoffs = {name: now - timedelta(seconds=secs)
+                       for name, secs in ACCURACY_WINDOWS.items()}
+
+            # Pending records for any window, in one query
+            pending = ",".join(
+                f"and({_ACCURACY_COLS[name][0]}.eq.false,created_at.lte.{_iso(cutoff)})"
+                for name, cutoff in cutoffs.items()
+            )
+            rows = _get(
+                "signal_accuracy",
+                f"or=({pending})"
+                f"&price_at_signal=gt.0"
+                f"&select=id,symbol,score,verdict,price_at_signal,bull_target,bear_target,bull_stop,bear_stop,"
+                f"created_at,checked_1h,checked_4h,checked_24h"
+                f"&limit={25 * len(ACCURACY_WINDOWS)}"
+            )
+            if not rows:
+                continue
+
+            client = get_client()
+
+            # Fetch current prices (group by symbol)
+            symbols = set(r["symbol"] for r in rows)
+            current_prices = await _fetch_current_prices(client, symbols)
+
+            updates: List[dict] = []
+            processed = dict.fromkeys(ACCURACY_WINDOWS, 0)
+            for row in rows:
+                sym = row["symbol"]
+                if sym not in current_prices:
+                    continue
+
+                price_now = current_prices[sym]
+                price_then = row["price_at_signal"]
+                score = row["score"] or 0
 
-            for window_name, window_seconds in ACCURACY_WINDOWS.items():
-                checked_col = f"checked_{window_name}"
-                price_col = f"price_{window_name}"
-                return_col = f"return_{window_name}"
-                correct_col = f"correct_{window_name}"
-
-                # Pending records for this window
-                cutoff = _iso(now - timedelta(seconds=window_seconds))
-                rows = _get(
-                    "signal_accuracy",
-                    f"{checked_col}=eq.false"
-                    f"&created_at=lte.{cutoff}"
-                    f"&price_at_signal=gt.0"
-                    f"&select=id,symbol,score,verdict,price_at_signal,bull_target,bear_target,bull_stop,bear_stop"
-                    f"&limit=25"
-                )
-                if not rows:
+                if price_then == 0:
                     continue
 
-                client = MultiExchangeClient()
-
-                # Fetch current prices (group by symbol)
-                symbols = set(r["symbol"] for r in rows)
-                current_prices = {}
-                for sym in symbols:
-                    try:
-                        ohlcv = await client.fetch_ohlcv(sym, "1m", limit=1)
-                        if ohlcv and ohlcv["close"]:
-                            current_prices[sym] = ohlcv["close"][-1]
-                    except Exception:
+                change_pct = round(((price_now - price_then) / price_then) * 100, 4)
+
+                # Direction correct?
+                if score > 5:
+                    correct = change_pct > 0
+                elif score < -5:
+                    correct = change_pct < 0
+                else:
+                    correct = abs(change_pct) < 1  # Neutral = stayed flat
+
+                # Every window this row is due for gets the same reading
+                created = datetime.fromisoformat(row["created_at"])
+                if created.tzinfo is None:  # plain timestamp column
+                    created = created.replace(tzinfo=timezone.utc)
+                update = {"id": row["id"]}
+                for window_name, cutoff in cutoffs.items():
+                    checked_col, price_col, return_col, correct_col = _ACCURACY_COLS[window_name]
+                    if row.get(checked_col) is not False or created > cutoff:
                         continue
+                    update[price_col] = price_now
+                    update[return_col] = change_pct
+                    update[correct_col] = correct
+                    update[checked_col] = True
+                    processed[window_name] += 1
+                if len(update) == 1:
+                    continue
 
-                for row in rows:
-                    sym = row["symbol"]
-                    if sym not in current_prices:
-                        continue
+                # Target / stop hit?
+                if score > 0 and row.get("bull_target"):
+                    update["target_hit"] = price_now >= row["bull_target"]
+                    if row.get("bull_stop"):
+                        update["stop_hit"] = price_now <= row["bull_stop"]
+                elif score < 0 and row.get("bear_target"):
+                    update["target_hit"] = price_now <= row["bear_target"]
+                    if row.get("bear_stop"):
+                        update["stop_hit"] = price_now >= row["bear_stop"]
 
-                    price_now = current_prices[sym]
-                    price_then = row["price_at_signal"]
-                    score = row["score"] or 0
+                updates.append(update)
 
-                    if price_then == 0:
-                        continue
+            for window_name, n in processed.items():
+                if n:
+                    logger.info("Accuracy check [%s]: processed %d signals", window_name, n)
 
-                    change_pct = round(((price_now - price_then) / price_then) * 100, 4)
-
-                    # Direction correct?
-                    if score > 5:
-                        correct = change_pct > 0
-                    elif score < -5:
-                        correct = change_pct < 0
-                    else:
-                        correct = abs(change_pct) < 1  # Neutral = stayed flat
-
-                    # Target / stop hit?
-                    target_hit = None
-                    stop_hit = None
-                    if score > 0 and row.get("bull_target"):
-                        target_hit = price_now >= row["bull_target"]
-                        if row.get("bull_stop"):
-                            stop_hit = price_now <= row["bull_stop"]
-                    elif score < 0 and row.get("bear_target"):
-                        target_hit = price_now <= row["bear_target"]
-                        if row.get("bear_stop"):
-                            stop_hit = price_now >= row["bear_stop"]
-
-                    update = {
-                        price_col: price_now,
-                        return_col: change_pct,
-                        correct_col: correct,
-                        checked_col: True,
-                    }
-                    if target_hit is not None:
-                        update["target_hit"] = target_hit
-                    if stop_hit is not None:
-                        update["stop_hit"] = stop_hit
-
-                    await asyncio.to_thread(
-                        _patch, "signal_accuracy", f"id=eq.{row['id']}", update
-                    )
-
-                logger.info("Accuracy check [%s]: processed %d signals", window_name, len(rows))
+            if updates:
+                await asyncio.get_running_loop().run_in_executor(
+                    _WRITE_POOL, _flush_accuracy_updates, updates)
 
         except Exception as e:
             logger.exception("Accuracy checker error: %s", e)
@@ -379,8 +547,34 @@ async def check_signal_accuracy():
 
 # ═══════════════════════════════════════════════════════════════════════════
 # Query functions  (sync — used by Flask dashboard)
+#
+# Aggregations run server-side via the RPCs in supabase_functions.sql when
+# they are installed; otherwise rows are fetched and grouped here.
 # ═══════════════════════════════════════════════════════════════════════════
 
+_DASH_CACHE = CacheManager(ttl_seconds=config.DASHBOARD_CACHE_TTL_SECONDS, maxsize=64)
+
+
+def _dashboard_cached(func):
+    """Serve repeat calls (same args) from _DASH_CACHE for a short TTL."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = f"{func.__name__}:{args}:{sorted(kwargs.items())}"
+        cached = _DASH_CACHE.get(key)
+        if cached is not None:
+            return cached
+        result = func(*args, **kwargs)
+        _DASH_CACHE.set(key, result)
+        return result
+    return wrapper
+
+
+def clear_dashboard_cache():
+    """Forget all cached dashboard results."""
+    _DASH_CACHE.clear()
+
+
+@_dashboard_cached
 def get_overview_stats() -> Dict:
     """High-level stats for the dashboard header."""
     now = datetime.now(timezone.utc)
@@ -388,12 +582,12 @@ def get_overview_stats() -> Dict:
     week_iso = _iso(now - timedelta(days=7))
     day_iso = _iso(now - timedelta(hours=24))
 
-    total_users = len(_get("bot_users", "select=id"))
-    active_24h = len(_get("bot_users", f"select=id&last_seen=gte.{day_iso}"))
-    total_analyses = len(_get("analyses", "select=id"))
-    analyses_today = len(_get("analyses", f"select=id&created_at=gte.{today_iso}"))
-    analyses_week = len(_get("analyses", f"select=id&created_at=gte.{week_iso}"))
-    errors_today = len(_get("bot_errors", f"select=id&created_at=gte.{today_iso}"))
+    total_users = _count("bot_users", "select=id")
+    active_24h = _count("bot_users", f"select=id&last_seen=gte.{day_iso}")
+    total_analyses = _count("analyses", "select=id")
+    analyses_today = _count("analyses", f"select=id&created_at=gte.{today_iso}")
+    analyses_week = _count("analyses", f"select=id&created_at=gte.{week_iso}")
+    errors_today = _count("bot_errors", f"select=id&created_at=gte.{today_iso}")
 
     success_rate = round(
         ((analyses_today - errors_today) / analyses_today * 100)
@@ -411,84 +605,90 @@ def get_overview_stats() -> Dict:
     }
 
 
+@_dashboard_cached
 def get_popular_coins(limit: int = 15) -> List[Dict]:
     """Most analyzed coins with avg score."""
-    rows = _get("analyses", "select=symbol,score,confidence,verdict")
-    if not rows:
-        return []
-    buckets: Dict[str, dict] = {}
+    agg = _rpc("popular_coins", {"lim": limit})
+    if agg is not None:
+        return agg
+    rows = _get_paged("analyses", "select=symbol,score,confidence,verdict")
+    buckets: Dict[str, list] = defaultdict(lambda: [0, 0, 0])  # count, Σscore, Σconf
     for r in rows:
-        sym = r["symbol"]
-        if sym not in buckets:
-            buckets[sym] = {"symbol": sym, "count": 0, "total_score": 0, "total_conf": 0}
-        buckets[sym]["count"] += 1
-        buckets[sym]["total_score"] += (r["score"] or 0)
-        buckets[sym]["total_conf"] += (r["confidence"] or 0)
-    ranked = sorted(buckets.values(), key=lambda x: x["count"], reverse=True)[:limit]
-    for s in ranked:
-        n = s["count"]
-        s["avg_score"] = round(s.pop("total_score") / n, 1) if n else 0
-        s["avg_conf"] = round(s.pop("total_conf") / n, 0) if n else 0
-    return ranked
+        b = buckets[r["symbol"]]
+        b[0] += 1
+        b[1] += (r["score"] or 0)
+        b[2] += (r["confidence"] or 0)
+    ranked = sorted(buckets.items(), key=lambda x: x[1][0], reverse=True)[:limit]
+    return [
+        {
+            "symbol": sym,
+            "count": n,
+            "avg_score": round(total_score / n, 1) if n else 0,
+            "avg_conf": round(total_conf / n, 0) if n else 0,
+        }
+        for sym, (n, total_score, total_conf) in ranked
+    ]
 
 
+@_dashboard_cached
 def get_popular_timeframes() -> List[Dict]:
     """Timeframe usage distribution."""
-    rows = _get("analyses", "select=timeframe")
-    if not rows:
-        return []
-    dist: Dict[str, int] = {}
-    for r in rows:
-        tf = r.get("timeframe", "?")
-        dist[tf] = dist.get(tf, 0) + 1
-    return [{"timeframe": k, "count": v} for k, v in sorted(dist.items(), key=lambda x: -x[1])]
+    agg = _rpc("popular_timeframes")
+    if agg is not None:
+        return agg
+    rows = _get_paged("analyses", "select=timeframe")
+    dist = Counter(r.get("timeframe") or "?" for r in rows)
+    return [{"timeframe": k, "count": v} for k, v in dist.most_common()]
 
 
+@_dashboard_cached
 def get_signal_distribution() -> List[Dict]:
     """How many of each verdict type."""
-    rows = _get("analyses", "select=verdict")
-    if not rows:
-        return []
-    dist: Dict[str, int] = {}
-    for r in rows:
-        v = r.get("verdict") or "Unknown"
-        dist[v] = dist.get(v, 0) + 1
-    return [{"verdict": k, "count": v} for k, v in sorted(dist.items(), key=lambda x: -x[1])]
+    agg = _rpc("signal_distribution")
+    if agg is not None:
+        return agg
+    rows = _get_paged("analyses", "select=verdict")
+    dist = Counter(r.get("verdict") or "Unknown" for r in rows)
+    return [{"verdict": k, "count": v} for k, v in dist.most_common()]
 
 
+@_dashboard_cached
 def get_usage_over_time(days: int = 30) -> List[Dict]:
     """Analyses per day."""
+    agg = _rpc("usage_over_time", {"days": days})
+    if agg is not None:
+        return agg
     since = _iso(datetime.now(timezone.utc) - timedelta(days=days))
-    rows = _get("analyses", f"select=created_at&created_at=gte.{since}")
-    if not rows:
-        return []
-    daily: Dict[str, int] = {}
-    for r in rows:
-        day = r.get("created_at", "")[:10]
-        daily[day] = daily.get(day, 0) + 1
+    rows = _get_paged("analyses", f"select=created_at&created_at=gte.{since}")
+    daily = Counter(r.get("created_at", "")[:10] for r in rows)
     return [{"day": k, "count": v} for k, v in sorted(daily.items())]
 
 
+@_dashboard_cached
 def get_hourly_usage(days: int = 7) -> List[Dict]:
     """Analyses by hour-of-day (aggregated)."""
+    agg = _rpc("hourly_usage", {"days": days})
+    if agg is not None:
+        return agg
     since = _iso(datetime.now(timezone.utc) - timedelta(days=days))
-    rows = _get("analyses", f"select=created_at&created_at=gte.{since}")
-    if not rows:
-        return []
-    hourly: Dict[int, int] = {}
+    rows = _get_paged("analyses", f"select=created_at&created_at=gte.{since}")
+    hourly: Dict[int, int] = Counter()
     for r in rows:
         ts = r.get("created_at", "")
         if len(ts) >= 13:
             try:
-                h = int(ts[11:13])
-                hourly[h] = hourly.get(h, 0) + 1
+                hourly[int(ts[11:13])] += 1
             except ValueError:
                 pass
     return [{"hour": k, "count": v} for k, v in sorted(hourly.items())]
 
 
+@_dashboard_cached
 def get_users(limit: int = 50) -> List[Dict]:
     """User list with stats."""
+    agg = _rpc("top_users_with_favs", {"lim": limit})
+    if agg is not None:
+        return agg
     rows = _get("bot_users", f"select=telegram_id,username,first_name,last_name,first_seen,last_seen,total_analyses&order=total_analyses.desc&limit={limit}")
     # Enrich with favourite symbol/timeframe
     for u in rows:
@@ -519,25 +719,29 @@ def get_recent_activity(limit: int = 50) -> List[Dict]:
     )
 
 
+@_dashboard_cached
 def get_accuracy_stats() -> Dict:
     """Signal accuracy metrics across all check windows."""
-    rows = _get("signal_accuracy", "select=checked_1h,checked_4h,checked_24h,correct_1h,correct_4h,correct_24h,return_1h,return_4h,return_24h,target_hit,stop_hit")
-    if not rows:
-        return {w: {"total_checked": 0, "direction_accuracy": 0, "avg_price_change": 0, "target_hit_rate": 0, "stop_hit_rate": 0} for w in ACCURACY_WINDOWS}
+    rows = _get_paged("signal_accuracy", "select=checked_1h,checked_4h,checked_24h,correct_1h,correct_4h,correct_24h,return_1h,return_4h,return_24h,target_hit,stop_hit")
+    # One pass over the rows, accumulating every window's counters at once
+    keys = [(w, checked, correct, ret) for w, (checked, _, ret, correct) in _ACCURACY_COLS.items()]
+    acc = {w: [0, 0, 0.0, 0, 0] for w in ACCURACY_WINDOWS}  # total, correct, Σreturn, targets, stops
+    for r in rows:
+        target_hit = bool(r.get("target_hit"))
+        stop_hit = bool(r.get("stop_hit"))
+        for window, checked_key, correct_key, return_key in keys:
+            if not r.get(checked_key):
+                continue
+            a = acc[window]
+            a[0] += 1
+            a[1] += bool(r.get(correct_key))
+            a[2] += r.get(return_key) or 0
+            a[3] += target_hit
+            a[4] += stop_hit
 
     result = {}
-    for window in ACCURACY_WINDOWS:
-        checked_key = f"checked_{window}"
-        correct_key = f"correct_{window}"
-        return_key = f"return_{window}"
-
-        checked = [r for r in rows if r.get(checked_key)]
-        total = len(checked)
-        correct = sum(1 for r in checked if r.get(correct_key))
-        avg_change = sum(r.get(return_key, 0) or 0 for r in checked) / total if total else 0
-        targets = sum(1 for r in checked if r.get("target_hit"))
-        stops = sum(1 for r in checked if r.get("stop_hit"))
-
+    for window, (total, correct, sum_change, targets, stops) in acc.items():
+        avg_change = sum_change / total if total else 0
         result[window] = {
             "total_checked": total,
             "direction_accuracy": round((correct / total * 100) if total > 0 else 0, 1),
@@ -548,22 +752,22 @@ def get_accuracy_stats() -> Dict:
     return result
 
 
+@_dashboard_cached
 def get_accuracy_by_verdict() -> List[Dict]:
     """Accuracy broken down by signal verdict (4h window)."""
-    rows = _get("signal_accuracy", "select=verdict,correct_4h,checked_4h,return_4h")
-    if not rows:
-        return []
-    buckets: Dict[str, dict] = {}
+    agg = _rpc("accuracy_by_verdict_4h")
+    if agg is not None:
+        return agg
+    rows = _get_paged("signal_accuracy", "select=verdict,correct_4h,checked_4h,return_4h")
+    buckets: Dict[str, dict] = defaultdict(lambda: {"total": 0, "correct": 0, "returns": []})
     for r in rows:
-        v = r.get("verdict", "Unknown")
-        if v not in buckets:
-            buckets[v] = {"verdict": v, "total": 0, "correct": 0, "returns": []}
+        b = buckets[r.get("verdict") or "Unknown"]
         if r.get("checked_4h"):
-            buckets[v]["total"] += 1
+            b["total"] += 1
             if r.get("correct_4h"):
-                buckets[v]["correct"] += 1
+                b["correct"] += 1
             if r.get("return_4h") is not None:
-                buckets[v]["returns"].append(r["return_4h"])
+                b["returns"].append(r["return_4h"])
 
     result = []
     for v, d in buckets.items():
@@ -577,22 +781,22 @@ def get_accuracy_by_verdict() -> List[Dict]:
     return sorted(result, key=lambda x: -x["total"])
 
 
+@_dashboard_cached
 def get_accuracy_by_coin() -> List[Dict]:
     """Accuracy broken down by coin (4h window)."""
-    rows = _get("signal_accuracy", "select=symbol,correct_4h,checked_4h,return_4h")
-    if not rows:
-        return []
-    buckets: Dict[str, dict] = {}
+    agg = _rpc("accuracy_by_coin_4h", {"min_total": 2})
+    if agg is not None:
+        return agg
+    rows = _get_paged("signal_accuracy", "select=symbol,correct_4h,checked_4h,return_4h")
+    buckets: Dict[str, dict] = defaultdict(lambda: {"total": 0, "correct": 0, "returns": []})
     for r in rows:
-        sym = r["symbol"]
-        if sym not in buckets:
-            buckets[sym] = {"symbol": sym, "total": 0, "correct": 0, "returns": []}
+        b = buckets[r["symbol"]]
         if r.get("checked_4h"):
-            buckets[sym]["total"] += 1
+            b["total"] += 1
             if r.get("correct_4h"):
-                buckets[sym]["correct"] += 1
+                b["correct"] += 1
             if r.get("return_4h") is not None:
-                buckets[sym]["returns"].append(r["return_4h"])
+                b["returns"].append(r["return_4h"])
 
     result = []
     for sym, d in buckets.items():
@@ -608,11 +812,13 @@ def get_accuracy_by_coin() -> List[Dict]:
     return sorted(result, key=lambda x: -x["accuracy_pct"])
 
 
+@_dashboard_cached
 def get_accuracy_by_confidence() -> List[Dict]:
     """Do higher confidence signals perform better?"""
-    rows = _get("signal_accuracy", "select=confidence,correct_4h,checked_4h,return_4h")
-    if not rows:
-        return []
+    agg = _rpc("accuracy_by_confidence_4h")
+    if agg is not None:
+        return agg
+    rows = _get_paged("signal_accuracy", "select=confidence,correct_4h,checked_4h,return_4h")
     buckets = {
         "High (70-100%)": {"total": 0, "correct": 0, "returns": []},
         "Medium (40-69%)": {"total": 0, "correct": 0, "returns": []},
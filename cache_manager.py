@@ -1,45 +1,91 @@
 """Simple cache to reduce API calls"""
+import threading
 import time
-from typing import Dict, Optional
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
 
 
 class CacheManager:
-    def __init__(self, ttl_seconds: int = 60):
+    def __init__(self, ttl_seconds: int = 60, maxsize: int = 2048):
         """
         Initialize cache manager
         ttl_seconds: Time to live for cached data (default 60 seconds)
+        maxsize: Max entries kept; the oldest is dropped when full
         """
-        self.cache: Dict[str, tuple] = {}
+        # key → (expiry on the monotonic clock, data).  Entries stay in the
+        # order they were stored, so the oldest is always at the front.
+        self.cache: "OrderedDict[str, tuple]" = OrderedDict()
         self.ttl = ttl_seconds
-    
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        # The dashboard serves from several threads
+        self._lock = threading.Lock()
+
     def get(self, key: str) -> Optional[Dict]:
         """Get cached data if not expired"""
-        if key in self.cache:
-            data, timestamp = self.cache[key]
-            if time.time() - timestamp < self.ttl:
-                return data
-            else:
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry is not None:
+                if time.monotonic() < entry[0]:
+                    self.hits += 1
+                    return entry[1]
                 # Expired, remove it
-                del self.cache[key]
-        return None
-    
-    def set(self, key: str, data: Dict):
-        """Store data in cache with current timestamp"""
-        self.cache[key] = (data, time.time())
-    
+                self.cache.pop(key, None)
+            self.misses += 1
+            return None
+
+    def get_with_age(self, key: str, grace: float = 0) -> Optional[Tuple[Dict, float]]:
+        """
+        (data, seconds since it expired — negative while fresh) for entries
+        at most grace seconds past their TTL, so callers can serve stale
+        data while refreshing it
+        """
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry is not None:
+                overdue = time.monotonic() - entry[0]
+                if overdue < grace:
+                    self.hits += 1
+                    return entry[1], overdue
+                self.cache.pop(key, None)
+            self.misses += 1
+            return None
+
+    def set(self, key: str, data: Dict, ttl: Optional[float] = None):
+        """Store data in cache with current timestamp (and its own TTL if given)"""
+        with self._lock:
+            self.cache[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), data)
+            self.cache.move_to_end(key)
+            if len(self.cache) > self.maxsize:
+                self.cache.popitem(last=False)
+
+    def pop(self, key: str):
+        """Drop an entry if present"""
+        with self._lock:
+            self.cache.pop(key, None)
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self.cache.clear()
+
     def clear_expired(self):
         """Remove all expired entries"""
-        current_time = time.time()
-        expired_keys = [
-            key for key, (_, timestamp) in self.cache.items()
-            if current_time - timestamp >= self.ttl
-        ]
-        for key in expired_keys:
-            del self.cache[key]
-    
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, (expiry, _) in self.cache.items() if expiry <= now]
+            for key in expired:
+                del self.cache[key]
+
     def get_stats(self) -> Dict:
         """Get cache statistics"""
+        lookups = self.hits + self.misses
         return {
             "total_entries": len(self.cache),
-            "ttl_seconds": self.ttl
+            "ttl_seconds": self.ttl,
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate_pct": round(self.hits / lookups * 100, 1) if lookups else 0.0,
         }
@@ -44,6 +44,13 @@ VOLUME_MA_PERIOD = 20
 CLUSTER_TOLERANCE = 0.015  # 1.5% price tolerance for level clustering
 MIN_TOUCHES = 2  # minimum touches to confirm a level
 LEVEL_LOOKBACK = 100
+LEVEL_METHOD = "cluster"  # "cluster" (sorted, anchored) or "histogram" (fixed bins, no sort)
+
+# Multi-timeframe trend
+# Skip the 1h / 4h trend passes when the primary TF is sideways with neutral
+# momentum.  Faster, but the higher TFs can no longer lift such a setup out
+# of "neutral", so it is off by default.
+MTF_FAST_PATH = False
 
 # Signal scoring weights
 WEIGHT_TREND = 0.25
@@ -52,5 +59,53 @@ WEIGHT_VOLUME = 0.20
 WEIGHT_LEVELS = 0.15
 WEIGHT_PATTERNS = 0.15
 
+# Telegram
+# Bot API connection pool; "2" needs the python-telegram-bot[http2] extra
+TELEGRAM_POOL_SIZE = int(os.getenv("TELEGRAM_POOL_SIZE", "256"))
+TELEGRAM_POOL_TIMEOUT = float(os.getenv("TELEGRAM_POOL_TIMEOUT", "30"))
+TELEGRAM_HTTP_VERSION = os.getenv("TELEGRAM_HTTP_VERSION", "2")
+# Updates handled at once; each runs as its own task, so one slow analysis
+# does not hold up other users' buttons
+TELEGRAM_CONCURRENT_UPDATES = int(os.getenv("TELEGRAM_CONCURRENT_UPDATES", "64"))
+# Picker state per user; unfinished flows are dropped after this
+USER_SESSION_TTL_SECONDS = 1800
+USER_SESSION_MAX = 10_000
+
+# Exchange
+MAX_CONCURRENT_FETCHES = 8  # OHLCV requests in flight at once in batch fetches
+MAX_CONCURRENT_ANALYSES = int(os.getenv("ANALYZE_CONCURRENCY", "8"))  # full analyses at once
+ANALYZE_TIMEOUT_SECONDS = float(os.getenv("ANALYZE_TIMEOUT", "20"))  # per bot request
+EXCHANGE_TIMEOUT_MS = 10_000  # per exchange HTTP request
+# Exchange HTTP connection pool
+HTTP_POOL_LIMIT = 50
+HTTP_DNS_CACHE_SECONDS = 300
+HTTP_KEEPALIVE_SECONDS = 60
+# Most requested symbols, fetched at startup so their first analysis is a
+# cache hit (comma-separated HOT_SYMBOLS overrides; empty warms only the markets)
+HOT_SYMBOLS = [s for s in os.getenv(
+    "HOT_SYMBOLS", "BTC/USDT,ETH/USDT,SOL/USDT,XRP/USDT").split(",") if s]
+HOT_TIMEFRAMES = ["15m", "1h", "4h"]
+
 # Cache
-CACHE_TTL_SECONDS = 45
+CACHE_TTL_SECONDS = 45  # timeframes not listed below
+# OHLCV TTL per timeframe, about a third of the candle length
+CACHE_TTL_BY_TIMEFRAME = {
+    "1m": 30, "5m": 120, "15m": 300,
+    "1h": 1200, "4h": 5400, "1d": 12 * 3600,
+}
+CACHE_GRACE_SECONDS = 30  # past the TTL, serve the cached OHLCV while refreshing it
+# The analysed timeframe's candles are refetched once older than this,
+# whatever their TTL above — their last close is the analysis's price
+PRIMARY_MAX_AGE_SECONDS = 60
+# array typecode for cached OHLCV prices/volume: "d" (float64) or "f"
+# (float32 — half the memory, but only ~7 significant digits, so e.g. a
+# 67000.12 close is stored as 67000.125)
+OHLCV_TYPECODE = os.getenv("OHLCV_TYPECODE", "d")
+# Exchange market metadata saved between runs, so restarts skip load_markets
+MARKETS_CACHE_PATH = os.getenv(
+    "MARKETS_CACHE_PATH",
+    os.path.expanduser("~/.cache/crypto-analysis-bot/markets_binance.json"))
+MARKETS_CACHE_TTL_SECONDS = 6 * 3600
+ANALYSIS_CACHE_TTL_SECONDS = 45  # finished analysis per (symbol, timeframe)
+DASHBOARD_CACHE_TTL_SECONDS = 45  # admin dashboard aggregations
+DASHBOARD_THREADS = int(os.getenv("DASHBOARD_THREADS", "8"))  # waitress worker threads
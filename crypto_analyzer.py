@@ -6,28 +6,47 @@ to the indicator / analysis modules.  All heavy calculation lives in
 indicators.py, patterns.py, analysis_components.py, and signal_engine.py.
 """
 import asyncio
-from typing import Dict
+from typing import Dict, Optional
 from multi_exchange_client import MultiExchangeClient
 import config
 
 
+_CLIENT: Optional[MultiExchangeClient] = None
+
+
+def get_client() -> MultiExchangeClient:
+    """
+    The shared exchange client, created on first use.  A fresh one is made
+    if the singleton has been closed (close() resets it).
+    """
+    global _CLIENT
+    if _CLIENT is None or MultiExchangeClient._instance is not _CLIENT:
+        _CLIENT = MultiExchangeClient()
+    return _CLIENT
+
+
 async def fetch_ohlcv(symbol: str, timeframe: str,
-                      limit: int = None) -> Dict:
+                      limit: int = None, max_age: float = None) -> Dict:
     """Fetch OHLCV data through the singleton exchange client."""
     limit = limit or config.DEFAULT_LOOKBACK
-    client = MultiExchangeClient()          # returns singleton
-    return await client.fetch_ohlcv(symbol, timeframe, limit)
+    client = get_client()
+    return await client.fetch_ohlcv(symbol, timeframe, limit, max_age=max_age)
 
 
 async def fetch_multi_tf(symbol: str, primary_tf: str) -> Dict:
     """
     Fetch primary + 1h + 4h data in parallel for multi-TF analysis.
     Returns {"primary": ..., "1h": ..., "4h": ...}.
+
+    The primary candles give the current price, so they are never older
+    than PRIMARY_MAX_AGE_SECONDS whatever the timeframe's cache TTL; a
+    context timeframe equal to the primary one gets the same data.
     """
+    fresh = config.PRIMARY_MAX_AGE_SECONDS
     primary, h1, h4 = await asyncio.gather(
-        fetch_ohlcv(symbol, primary_tf),
-        fetch_ohlcv(symbol, "1h"),
-        fetch_ohlcv(symbol, "4h"),
+        fetch_ohlcv(symbol, primary_tf, max_age=fresh),
+        fetch_ohlcv(symbol, "1h", max_age=fresh if primary_tf == "1h" else None),
+        fetch_ohlcv(symbol, "4h", max_age=fresh if primary_tf == "4h" else None),
     )
     return {"primary": primary, "1h": h1, "4h": h4}
 
@@ -5,8 +5,17 @@ Serves the admin panel and provides JSON endpoints for all analytics data.
 Designed to run alongside the Telegram bot.  Uses Supabase-backed analytics.
 """
 import os
+import gzip
+import hashlib
+import hmac
 import logging
-from flask import Flask, render_template, jsonify, request
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+import config
+from flask import Flask, g, render_template, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+from cache_manager import CacheManager
 from analytics import (
     get_overview_stats,
     get_popular_coins,
@@ -21,23 +30,145 @@ from analytics import (
     get_accuracy_by_coin,
     get_accuracy_by_confidence,
     get_recent_errors,
+    clear_dashboard_cache,
 )
 
 logger = logging.getLogger(__name__)
 
+
+
+class _OrjsonProvider(DefaultJSONProvider):
+    """jsonify() through orjson: faster, unescaped UTF-8, keys left in order."""
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumpb(self, obj) -> bytes:
+        return orjson.dumps(obj, default=self.default, option=self._OPTIONS)
+
+    def dumps(self, obj, **kwargs) -> str:
+        return self.dumpb(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumpb(obj), mimetype=self.mimetype)
+
+
 app = Flask(__name__, template_folder="templates", static_folder="static")
+app.json = _OrjsonProvider(app)
 app.config["JSON_SORT_KEYS"] = False
 
 # Simple auth — set DASHBOARD_PASSWORD env var to protect the dashboard
 DASHBOARD_PASSWORD = os.getenv("DASHBOARD_PASSWORD", "")
+_PASSWORD_BYTES = DASHBOARD_PASSWORD.encode()
+
+
+@app.before_request
+def _authenticate():
+    """Resolve the token once per request, with a constant-time compare."""
+    if request.endpoint == "health":
+        return
+    if not DASHBOARD_PASSWORD:
+        g.authed = True
+        return
+    token = request.args.get("token") or request.headers.get("X-Dashboard-Token") or ""
+    g.authed = hmac.compare_digest(token.encode(), _PASSWORD_BYTES)
 
 
 def _check_auth():
     """Optional password protection."""
-    if not DASHBOARD_PASSWORD:
-        return True
-    token = request.args.get("token") or request.headers.get("X-Dashboard-Token")
-    return token == DASHBOARD_PASSWORD
+    return g.get("authed", False)
+
+
+# Per-endpoint response caches, plus the last good payload of every request
+# so a failing backend can still be answered (marked stale).  Entries hold
+# the serialized body, its ETag and, once a client has asked for it, its
+# gzip form.
+_RESPONSE_CACHES = []
+_LAST_GOOD = CacheManager(ttl_seconds=24 * 3600, maxsize=256)
+_GZIP_MIN_SIZE = 512
+_GZIP_LEVEL = 4
+
+
+def _new_entry(data) -> dict:
+    body = app.json.dumpb(data)
+    return {"body": body, "etag": hashlib.blake2b(body, digest_size=16).hexdigest()}
+
+
+def _json_response(entry: dict, max_age: int):
+    """
+    Response for a cached entry: 304 when the client's ETag still matches,
+    otherwise the body, gzipped when the client accepts it.  The gzip body
+    carries its own ETag, so a 304 never stands in for the other encoding.
+    """
+    gz = len(entry["body"]) >= _GZIP_MIN_SIZE and "gzip" in request.accept_encodings
+    etag = entry["etag"] + "-gz" if gz else entry["etag"]
+    if etag in request.if_none_match:
+        resp = app.response_class(status=304)
+    else:
+        resp = _body_response(entry, gz)
+    resp.set_etag(etag)
+    resp.vary.add("Accept-Encoding")
+    # private: responses may be behind the dashboard token
+    resp.headers["Cache-Control"] = f"private, max-age={max_age}, stale-while-revalidate=60"
+    return resp
+
+
+def _body_response(entry: dict, gz: bool):
+    if not gz:
+        return app.response_class(entry["body"], mimetype="application/json")
+    if "gzip" not in entry:
+        entry["gzip"] = gzip.compress(entry["body"], compresslevel=_GZIP_LEVEL)
+    resp = app.response_class(entry["gzip"], mimetype="application/json")
+    resp.headers["Content-Encoding"] = "gzip"
+    return resp
+
+
+def _api_endpoint(ttl: int):
+    """
+    Auth check, then serve the handler's JSON payload from a per-endpoint
+    TTL cache keyed on path + query args.  Sets X-Cache-Status.  Handlers
+    return plain data; it is serialized once per cache fill.
+    """
+    def decorator(func):
+        cache = CacheManager(ttl_seconds=ttl, maxsize=64)
+        _RESPONSE_CACHES.append(cache)
+
+        @functools.wraps(func)
+        def wrapper():
+            if not _check_auth():
+                return jsonify({"error": "unauthorized"}), 401
+            args = sorted((k, v) for k, v in request.args.items() if k != "token")
+            key = f"{request.path}?{args}"
+
+            status = "hit"
+            entry = cache.get(key)
+            if entry is None:
+                try:
+                    data = func()
+                except Exception:
+                    entry = _LAST_GOOD.get(key)
+                    if entry is None:
+                        raise
+                    logger.exception("%s failed — serving stale response", request.path)
+                    status = "stale"
+                else:
+                    entry = _new_entry(data)
+                    cache.set(key, entry)
+                    _LAST_GOOD.set(key, entry)
+                    status = "miss"
+
+            resp = _json_response(entry, ttl)
+            resp.headers["X-Cache-Status"] = status
+            return resp
+        return wrapper
+    return decorator
+
+
+def _clear_response_caches():
+    for cache in _RESPONSE_CACHES:
+        cache.clear()
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -56,97 +187,131 @@ def index():
 # ═══════════════════════════════════════════════════════════════════════════
 
 @app.route("/api/overview")
+@_api_endpoint(ttl=30)
 def api_overview():
-    if not _check_auth():
-        return jsonify({"error": "unauthorized"}), 401
-    return jsonify(get_overview_stats())
+    return get_overview_stats()
 
 
 @app.route("/api/popular-coins")
+@_api_endpoint(ttl=60)
 def api_popular_coins():
-    if not _check_auth():
-        return jsonify({"error": "unauthorized"}), 401
-    return jsonify(get_popular_coins())
+    return get_popular_coins()
 
 
 @app.route("/api/timeframes")
+@_api_endpoint(ttl=60)
 def api_timeframes():
-    if not _check_auth():
-        return jsonify({"error": "unauthorized"}), 401
-    return jsonify(get_popular_timeframes())
+    return get_popular_timeframes()
 
 
 @app.route("/api/signal-distribution")
+@_api_endpoint(ttl=60)
 def api_signal_distribution():
-    if not _check_auth():
-        return jsonify({"error": "unauthorized"}), 401
-    return jsonify(get_signal_distribution())
+    return get_signal_distribution()
 
 
 @app.route("/api/usage-daily")
+@_api_endpoint(ttl=60)
 def api_usage_daily():
-    if not _check_auth():
-        return jsonify({"error": "unauthorized"}), 401
     days = request.args.get("days", 30, type=int)
-    return jsonify(get_usage_over_time(days))
+    return get_usage_over_time(days)
 
 
 @app.route("/api/usage-hourly")
+@_api_endpoint(ttl=60)
 def api_usage_hourly():
-    if not _check_auth():
-        return jsonify({"error": "unauthorized"}), 401
-    return jsonify(get_hourly_usage())
+    return get_hourly_usage()
 
 
 @app.route("/api/users")
+@_api_endpoint(ttl=60)
 def api_users():
-    if not _check_auth():
-        return jsonify({"error": "unauthorized"}), 401
-    return jsonify(get_users())
+    return get_users()
 
 
 @app.route("/api/activity")
+@_api_endpoint(ttl=5)
 def api_activity():
-    if not _check_auth():
-        return jsonify({"error": "unauthorized"}), 401
     limit = request.args.get("limit", 50, type=int)
-    return jsonify(get_recent_activity(limit))
+    return get_recent_activity(limit)
 
 
 @app.route("/api/accuracy")
+@_api_endpoint(ttl=60)
 def api_accuracy():
-    if not _check_auth():
-        return jsonify({"error": "unauthorized"}), 401
-    return jsonify(get_accuracy_stats())
+    return get_accuracy_stats()
 
 
 @app.route("/api/accuracy/by-verdict")
+@_api_endpoint(ttl=60)
 def api_accuracy_by_verdict():
-    if not _check_auth():
-        return jsonify({"error": "unauthorized"}), 401
-    return jsonify(get_accuracy_by_verdict())
+    return get_accuracy_by_verdict()
 
 
 @app.route("/api/accuracy/by-coin")
+@_api_endpoint(ttl=60)
 def api_accuracy_by_coin():
-    if not _check_auth():
-        return jsonify({"error": "unauthorized"}), 401
-    return jsonify(get_accuracy_by_coin())
+    return get_accuracy_by_coin()
 
 
 @app.route("/api/accuracy/by-confidence")
+@_api_endpoint(ttl=60)
 def api_accuracy_by_confidence():
-    if not _check_auth():
-        return jsonify({"error": "unauthorized"}), 401
-    return jsonify(get_accuracy_by_confidence())
+    return get_accuracy_by_confidence()
 
 
 @app.route("/api/errors")
+@_api_endpoint(ttl=10)
 def api_errors():
+    limit = request.args.get("limit", 30, type=int)
+    return get_recent_errors(limit)
+
+
+_DASHBOARD_SECTIONS = {
+    "overview": get_overview_stats,
+    "popular_coins": get_popular_coins,
+    "timeframes": get_popular_timeframes,
+    "signal_distribution": get_signal_distribution,
+    "usage_daily": get_usage_over_time,
+    "usage_hourly": get_hourly_usage,
+    "users": get_users,
+    "accuracy": get_accuracy_stats,
+    "accuracy_by_verdict": get_accuracy_by_verdict,
+    "accuracy_by_coin": get_accuracy_by_coin,
+    "accuracy_by_confidence": get_accuracy_by_confidence,
+    "activity": get_recent_activity,
+    "errors": get_recent_errors,
+}
+_FANOUT = ThreadPoolExecutor(max_workers=len(_DASHBOARD_SECTIONS),
+                             thread_name_prefix="dashboard-fanout")
+
+
+@app.route("/api/dashboard")
+@_api_endpoint(ttl=5)
+def api_dashboard():
+    """
+    Every section of the admin page in one response.  The analytics calls
+    run in parallel; a section that fails comes back as null so the page
+    can fall back to its own endpoint.
+    """
+    futures = {name: _FANOUT.submit(fn) for name, fn in _DASHBOARD_SECTIONS.items()}
+    out = {}
+    for name, future in futures.items():
+        try:
+            out[name] = future.result()
+        except Exception:
+            logger.exception("Dashboard section %s failed", name)
+            out[name] = None
+    return out
+
+
+@app.route("/api/cache/clear", methods=["POST"])
+def api_cache_clear():
     if not _check_auth():
         return jsonify({"error": "unauthorized"}), 401
-    limit = request.args.get("limit", 30, type=int)
-    return jsonify(get_recent_errors(limit))
+    clear_dashboard_cache()
+    _clear_response_caches()
+    return jsonify({"status": "cleared"})
 
 
 @app.route("/health")
@@ -157,6 +322,11 @@ def health():
 
 
 def run_dashboard(port: int = 5000):
-    """Run the Flask dashboard (call from a thread)."""
-    logger.info("Dashboard starting on port %d", port)
-    app.run(host="0.0.0.0", port=port, debug=False, use_reloader=False)
+    """
+    Serve the dashboard with waitress (run.py starts this in its own
+    process).  Unlike gunicorn it needs no fork or master process.
+    """
+    from waitress import serve
+    logger.info("Dashboard starting on port %d (%d threads)", port, config.DASHBOARD_THREADS)
+    serve(app, host="0.0.0.0", port=port, threads=config.DASHBOARD_THREADS,
+          ident="dashboard")
@@ -10,32 +10,44 @@ from typing import Dict, List
 
 # ── Tiny helpers ──────────────────────────────────────────────────────────
 
+_BARS_W10 = tuple("▓" * f + "░" * (10 - f) for f in range(11))
+
+
 def _bar(value: float, max_val: float = 100, width: int = 10) -> str:
     filled = max(0, min(width, round(value / max_val * width)))
+    if width == 10:
+        return _BARS_W10[filled]
     return "▓" * filled + "░" * (width - filled)
 
 
+_ARROW_TABLE = {
+    "strong_up": "🟢⬆️",
+    "up": "🟢↗",
+    "sideways": "🟡➡️",
+    "down": "🔴↘",
+    "strong_down": "🔴⬇️",
+}
+
+
 def _arrow(direction: str) -> str:
-    d = direction.lower()
-    if "strong_up" in d or "strong up" in d:
-        return "🟢⬆️"
-    if "up" in d:
-        return "🟢↗"
-    if "strong_down" in d or "strong down" in d:
-        return "🔴⬇️"
-    if "down" in d:
-        return "🔴↘"
-    return "🟡➡️"
+    return _ARROW_TABLE.get(direction, "🟡➡️")
 
 
 def _score_emoji(score: float) -> str:
-    if score >= 40: return "🟢"
     if score >= 10: return "🟢"
-    if score <= -40: return "🔴"
     if score <= -10: return "🔴"
     return "🟡"
 
 
+_FLOW_LABELS = {
+    "strong_inflow": "🟢🟢 Strong Inflow", "inflow": "🟢 Inflow",
+    "balanced": "🟡 Balanced", "outflow": "🔴 Outflow",
+    "strong_outflow": "🔴🔴 Strong Outflow",
+}
+_BIAS_EMOJI = {"bullish": "🟢", "bearish": "🔴"}
+_PROB_EMOJI = {"high": "🟢", "medium": "🟡", "low": "🔴"}
+
+
 def _rsi_tag(rsi: float) -> str:
     if rsi >= 70: return "⚠️ Overbought"
     if rsi <= 30: return "⚠️ Oversold"
@@ -44,8 +56,18 @@ def _rsi_tag(rsi: float) -> str:
     return "Neutral"
 
 
-def _divider() -> str:
-    return "─ ─ ─ ─ ─ ─ ─ ─ ─ ─ ─ ─ ─ ─"
+_DIV = "─ ─ ─ ─ ─ ─ ─ ─ ─ ─ ─ ─ ─ ─"
+_SECTION_END = ("", _DIV)
+_BREAKDOWN_MAX = (("trend", 25), ("momentum", 25), ("volume", 20), ("levels", 15), ("patterns", 15))
+
+
+def _tf_line(tf_data: Dict, timeframe: str) -> str:
+    tf_label = tf_data["tf"].upper() if tf_data["tf"] != "primary" else timeframe.upper()
+    if tf_data.get("skipped"):
+        return f"  ⚪ <b>{tf_label}</b> — skipped (primary is flat)"
+    arrow = _arrow(tf_data["direction"])
+    strength = "strong" if tf_data["adx"] > 25 else "weak"
+    return f"  {arrow} <b>{tf_label}</b> — {tf_data['direction'].replace('_', ' ')}  ({strength}, ADX {tf_data['adx']})"
 
 
 def format_analysis(symbol: str, timeframe: str, indicators: Dict,
@@ -69,32 +91,26 @@ def format_analysis(symbol: str, timeframe: str, indicators: Dict,
     bar = _bar(abs(s["score"]))
     label = "bullish" if s["score"] > 0 else "bearish" if s["score"] < 0 else "flat"
     L.append(f"{bar}  {label}")
-    L.append("")
-    L.append(_divider())
+    L.extend(_SECTION_END)
 
     # ━━ SCORE BREAKDOWN ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     bd = s["breakdown"]
     L.append("")
     L.append("📈 <b>Score Breakdown</b>")
-    for key, mx in [("trend", 25), ("momentum", 25), ("volume", 20), ("levels", 15), ("patterns", 15)]:
-        val = bd[key]
-        emoji = _score_emoji(val / mx * 100 if mx else 0)
-        L.append(f"  {emoji} {key.title()}: <b>{val:+.1f}</b>")
-    L.append("")
-    L.append(_divider())
+    L.extend(
+        f"  {_score_emoji(bd[key] / mx * 100)} {key.title()}: <b>{bd[key]:+.1f}</b>"
+        for key, mx in _BREAKDOWN_MAX
+    )
+    L.extend(_SECTION_END)
 
     # ━━ MULTI-TF TREND ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     L.append("")
     L.append("🔀 <b>Trend by Timeframe</b>")
-    for tf_data in (trend["primary"], trend["tf_1h"], trend["tf_4h"]):
-        tf_label = tf_data["tf"].upper() if tf_data["tf"] != "primary" else timeframe.upper()
-        arrow = _arrow(tf_data["direction"])
-        strength = "strong" if tf_data["adx"] > 25 else "weak"
-        L.append(f"  {arrow} <b>{tf_label}</b> — {tf_data['direction'].replace('_', ' ')}  ({strength}, ADX {tf_data['adx']})")
+    L.extend(_tf_line(tf_data, timeframe)
+             for tf_data in (trend["primary"], trend["tf_1h"], trend["tf_4h"]))
     overall = trend["overall"].replace("_", " ")
     L.append(f"  📊 Confluence: <b>{trend['confluence_score']:+.1f}</b> → {overall}")
-    L.append("")
-    L.append(_divider())
+    L.extend(_SECTION_END)
 
     # ━━ INDICATORS ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     L.append("")
@@ -127,8 +143,7 @@ def format_analysis(symbol: str, timeframe: str, indicators: Dict,
     vwap_pos = "above ✅" if indicators["price_vs_vwap"] > 0 else "below ❌"
     L.append(f"  <b>VWAP:</b>  {indicators['vwap']:,.2f}  ({vwap_pos})")
 
-    L.append("")
-    L.append(_divider())
+    L.extend(_SECTION_END)
 
     # ━━ KEY LEVELS ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     L.append("")
@@ -139,41 +154,35 @@ def format_analysis(symbol: str, timeframe: str, indicators: Dict,
     L.append(f"  ▶️ <b>NOW  ${levels['current']}</b>  (range: {levels['range_position']:.0f}%)")
     L.append(f"  🔻 S1  <b>${levels['s1']}</b>  ({levels['s1_touches']} touches)")
     L.append(f"  🔻 S2  <b>${levels['s2']}</b>  ({levels['s2_touches']} touches)")
-    L.append("")
-    L.append(_divider())
+    L.extend(_SECTION_END)
 
     # ━━ MONEY FLOW ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     L.append("")
     L.append("💰 <b>Money Flow</b>")
-    flow_map = {"strong_inflow": "🟢🟢 Strong Inflow", "inflow": "🟢 Inflow",
-                "balanced": "🟡 Balanced", "outflow": "🔴 Outflow",
-                "strong_outflow": "🔴🔴 Strong Outflow"}
-    L.append(f"  {flow_map.get(flow['flow'], flow['flow'])}")
+    L.append(f"  {_FLOW_LABELS.get(flow['flow'], flow['flow'])}")
     L.append(f"  Buy  {_bar(flow['buy_pct'])}  {flow['buy_pct']:.0f}%")
     L.append(f"  Sell {_bar(flow['sell_pct'])}  {flow['sell_pct']:.0f}%")
     vol_note = "🔥 SPIKE" if flow["vol_spike"] else flow["vol_trend"]
     L.append(f"  Vol: <b>{flow['vol_ratio']:.1f}x</b> avg  {vol_note}")
     L.append(f"  OBV: {flow['obv_trend']}")
-    L.append("")
-    L.append(_divider())
+    L.extend(_SECTION_END)
 
     # ━━ CANDLE PATTERNS ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     if patterns:
         L.append("")
         L.append("🕯 <b>Candle Patterns</b>")
         for p in patterns[:4]:
-            bias_e = "🟢" if p["bias"] == "bullish" else "🔴" if p["bias"] == "bearish" else "🟡"
+            bias_e = _BIAS_EMOJI.get(p["bias"], "🟡")
             stars = "★" * p["strength"]
             when = "now" if p["bars_ago"] == 0 else f"{p['bars_ago']}b ago"
             L.append(f"  {bias_e} {p['name']}  {stars}  ({when})")
-        L.append("")
-        L.append(_divider())
+        L.extend(_SECTION_END)
 
     # ━━ SCENARIOS ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     L.append("")
     L.append("🗺 <b>Scenarios</b>")
     for sc in scenarios:
-        prob_e = {"high": "🟢", "medium": "🟡", "low": "🔴"}.get(sc["probability"], "⚪")
+        prob_e = _PROB_EMOJI.get(sc["probability"], "⚪")
         L.append("")
         L.append(f"{sc['emoji']} <b>{sc['label']}</b>  {prob_e} {sc['probability']}")
         L.append(f"  IF → {sc['trigger']}")
@@ -181,8 +190,7 @@ def format_analysis(symbol: str, timeframe: str, indicators: Dict,
         L.append(f"  🛑 Stop: {sc['stop']}")
         if sc.get("rr_ratio"):
             L.append(f"  R:R  <b>{sc['rr_ratio']:.1f}</b>")
-    L.append("")
-    L.append(_divider())
+    L.extend(_SECTION_END)
 
     # ━━ SESSION ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     L.append("")
@@ -1,9 +1,14 @@
 """
 Technical indicators — computed from raw OHLCV lists.
 
-Every function takes plain Python lists (no pandas/numpy needed) so the bot
-stays lightweight.  Each returns either a single float or a list.
+Every function takes plain Python sequences — lists, or the array('d') columns
+the exchange client returns (no pandas/numpy needed) — so the bot stays
+lightweight.  Each returns either a single float or a list.
 """
+from collections import deque
+import copy
+from itertools import accumulate, islice
+from operator import sub
 from typing import Dict, List, Optional, Tuple
 import math
 import config
@@ -14,20 +19,25 @@ import config
 # ═══════════════════════════════════════════════════════════════════════════
 
 def sma(data: List[float], period: int) -> List[float]:
-    """Simple Moving Average — returns list aligned with *data* (NaN-padded)."""
+    """
+    Simple Moving Average — returns list aligned with *data* (NaN-padded).
+    Window sums come from one running-sum pass rather than a re-sum per bar.
+    """
     out: List[float] = [float("nan")] * (period - 1)
-    for i in range(period - 1, len(data)):
-        out.append(sum(data[i - period + 1 : i + 1]) / period)
+    if len(data) < period:
+        return out
+    running = list(accumulate(data, initial=0.0))
+    out.extend(map(lambda hi, lo: (hi - lo) / period,
+                   islice(running, period, None), running))
     return out
 
 
 def ema(data: List[float], period: int) -> List[float]:
     """Exponential Moving Average."""
     k = 2 / (period + 1)
-    out: List[float] = [data[0]]
-    for price in data[1:]:
-        out.append(price * k + out[-1] * (1 - k))
-    return out
+    return list(accumulate(islice(data, 1, None),
+                           lambda prev, price: price * k + prev * (1 - k),
+                           initial=data[0]))
 
 
 def sma_last(data: List[float], period: int) -> float:
@@ -49,30 +59,22 @@ def ema_last(data: List[float], period: int) -> float:
 def rsi(closes: List[float], period: Optional[int] = None) -> List[float]:
     """Relative Strength Index (Wilder smoothing)."""
     period = period or config.RSI_PERIOD
-    deltas = [closes[i] - closes[i - 1] for i in range(1, len(closes))]
+    deltas = list(map(sub, islice(closes, 1, None), closes))
 
-    gains = [max(d, 0) for d in deltas]
-    losses = [abs(min(d, 0)) for d in deltas]
+    gains = [d if d > 0 else 0.0 for d in deltas]
+    losses = [-d if d < 0 else 0.0 for d in deltas]
 
-    avg_gain = sum(gains[:period]) / period
-    avg_loss = sum(losses[:period]) / period
+    # Wilder smoothing, seeded with the plain mean of the first *period*
+    def wilder(vals):
+        return accumulate(islice(vals, period, None),
+                          lambda avg, x: (avg * (period - 1) + x) / period,
+                          initial=sum(vals[:period]) / period)
 
     rsi_values: List[float] = [float("nan")] * period
-    if avg_loss == 0:
-        rsi_values.append(100.0)
-    else:
-        rs = avg_gain / avg_loss
-        rsi_values.append(100 - 100 / (1 + rs))
-
-    for i in range(period, len(deltas)):
-        avg_gain = (avg_gain * (period - 1) + gains[i]) / period
-        avg_loss = (avg_loss * (period - 1) + losses[i]) / period
-        if avg_loss == 0:
-            rsi_values.append(100.0)
-        else:
-            rs = avg_gain / avg_loss
-            rsi_values.append(100 - 100 / (1 + rs))
-
+    rsi_values.extend(
+        100.0 if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss)
+        for avg_gain, avg_loss in zip(wilder(gains), wilder(losses))
+    )
     return rsi_values
 
 
@@ -104,12 +106,18 @@ def macd(closes: List[float],
 
 
 def macd_last(closes: List[float]) -> Dict[str, float]:
-    m = macd(closes)
-    return {
-        "macd": m["macd"][-1],
-        "signal": m["signal"][-1],
-        "histogram": m["histogram"][-1],
-    }
+    """Latest MACD triple from scalar EMAs in one pass (no series lists)."""
+    kf = 2 / (config.MACD_FAST + 1)
+    ks = 2 / (config.MACD_SLOW + 1)
+    ksig = 2 / (config.MACD_SIGNAL + 1)
+    ef = es = closes[0]
+    sig = ef - es
+    for c in islice(closes, 1, None):
+        ef = c * kf + ef * (1 - kf)
+        es = c * ks + es * (1 - ks)
+        sig = (ef - es) * ksig + sig * (1 - ksig)
+    m = ef - es
+    return {"macd": m, "signal": sig, "histogram": m - sig}
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -119,25 +127,36 @@ def macd_last(closes: List[float]) -> Dict[str, float]:
 def bollinger_bands(closes: List[float],
                     period: Optional[int] = None, std_mult: Optional[float] = None
                     ) -> Dict[str, List[float]]:
-    """Upper, middle (SMA), lower bands."""
+    """
+    Upper, middle (SMA), lower bands.
+    The window variance slides with a Welford-style update, O(1) per bar.
+    """
     period = period or config.BB_PERIOD
     std_mult = std_mult or config.BB_STD
 
+    nan = float("nan")
     middle = sma(closes, period)
-    upper: List[float] = []
-    lower: List[float] = []
-
-    for i in range(len(closes)):
-        if math.isnan(middle[i]):
-            upper.append(float("nan"))
-            lower.append(float("nan"))
-        else:
-            window = closes[max(0, i - period + 1) : i + 1]
-            mean = middle[i]
-            variance = sum((x - mean) ** 2 for x in window) / len(window)
-            std = math.sqrt(variance)
-            upper.append(mean + std_mult * std)
-            lower.append(mean - std_mult * std)
+    upper: List[float] = [nan] * min(period - 1, len(closes))
+    lower: List[float] = upper[:]
+    if len(closes) < period:
+        return {"upper": upper, "middle": middle, "lower": lower}
+
+    mean = 0.0
+    m2 = 0.0
+    for count, x in enumerate(closes[:period], 1):
+        delta = x - mean
+        mean += delta / count
+        m2 += delta * (x - mean)
+
+    for i in range(period - 1, len(closes)):
+        if i >= period:
+            new, old = closes[i], closes[i - period]
+            prev_mean = mean
+            mean += (new - old) / period
+            m2 += (new - old) * (new - mean + old - prev_mean)
+        std = math.sqrt(m2 / period) if m2 > 0 else 0.0
+        upper.append(middle[i] + std_mult * std)
+        lower.append(middle[i] - std_mult * std)
 
     return {"upper": upper, "middle": middle, "lower": lower}
 
@@ -158,24 +177,37 @@ def bb_last(closes: List[float]) -> Dict[str, float]:
 # ATR (Average True Range)
 # ═══════════════════════════════════════════════════════════════════════════
 
+def true_range(highs: List[float], lows: List[float],
+               closes: List[float]) -> List[float]:
+    """True range per bar; the first bar has no previous close so uses H-L."""
+    tr_list: List[float] = [highs[0] - lows[0]]
+    append = tr_list.append
+    prev_close = closes[0]
+    for h, l, c in zip(islice(highs, 1, None), islice(lows, 1, None),
+                       islice(closes, 1, None)):
+        # explicit comparisons beat a max()/abs() call per bar
+        tr = h - l
+        hc = h - prev_close if h > prev_close else prev_close - h
+        lc = l - prev_close if l > prev_close else prev_close - l
+        if hc > tr:
+            tr = hc
+        if lc > tr:
+            tr = lc
+        append(tr)
+        prev_close = c
+    return tr_list
+
+
 def atr(highs: List[float], lows: List[float], closes: List[float],
         period: Optional[int] = None) -> List[float]:
     """Wilder-smoothed ATR."""
     period = period or config.ATR_PERIOD
-    tr_list: List[float] = [highs[0] - lows[0]]
-    for i in range(1, len(closes)):
-        tr = max(
-            highs[i] - lows[i],
-            abs(highs[i] - closes[i - 1]),
-            abs(lows[i] - closes[i - 1]),
-        )
-        tr_list.append(tr)
+    tr_list = true_range(highs, lows, closes)
 
     atr_vals: List[float] = [float("nan")] * (period - 1)
-    atr_vals.append(sum(tr_list[:period]) / period)
-    for i in range(period, len(tr_list)):
-        atr_vals.append((atr_vals[-1] * (period - 1) + tr_list[i]) / period)
-
+    atr_vals.extend(accumulate(islice(tr_list, period, None),
+                               lambda prev, tr: (prev * (period - 1) + tr) / period,
+                               initial=sum(tr_list[:period]) / period))
     return atr_vals
 
 
@@ -191,16 +223,32 @@ def atr_last(highs: List[float], lows: List[float], closes: List[float],
 def stochastic(highs: List[float], lows: List[float], closes: List[float],
                k_period: int = 14, d_period: int = 3
                ) -> Dict[str, List[float]]:
-    """%K and %D."""
+    """
+    %K and %D.
+    The window high/low come from monotonic deques, O(1) amortised per bar.
+    """
     k_vals: List[float] = []
-    for i in range(len(closes)):
-        start = max(0, i - k_period + 1)
-        h = max(highs[start : i + 1])
-        l = min(lows[start : i + 1])
+    win_high: deque = deque()       # bar indexes, highs decreasing
+    win_low: deque = deque()        # bar indexes, lows increasing
+    for i, close in enumerate(closes):
+        while win_high and highs[win_high[-1]] <= highs[i]:
+            win_high.pop()
+        win_high.append(i)
+        while win_low and lows[win_low[-1]] >= lows[i]:
+            win_low.pop()
+        win_low.append(i)
+        start = i - k_period + 1
+        if win_high[0] < start:
+            win_high.popleft()
+        if win_low[0] < start:
+            win_low.popleft()
+
+        h = highs[win_high[0]]
+        l = lows[win_low[0]]
         if h == l:
             k_vals.append(50.0)
         else:
-            k_vals.append((closes[i] - l) / (h - l) * 100)
+            k_vals.append((close - l) / (h - l) * 100)
 
     d_vals = sma(k_vals, d_period)
     return {"k": k_vals, "d": d_vals}
@@ -218,30 +266,23 @@ def stochastic_last(highs, lows, closes) -> Dict[str, float]:
 def adx(highs: List[float], lows: List[float], closes: List[float],
         period: int = 14) -> Dict[str, float]:
     """Returns latest ADX, +DI, -DI."""
+    if len(closes) - 1 < period:
+        return {"adx": 25.0, "plus_di": 50.0, "minus_di": 50.0}
+
     plus_dm: List[float] = []
     minus_dm: List[float] = []
-    tr_list: List[float] = []
-
     for i in range(1, len(closes)):
         up = highs[i] - highs[i - 1]
         down = lows[i - 1] - lows[i]
         plus_dm.append(up if up > down and up > 0 else 0)
         minus_dm.append(down if down > up and down > 0 else 0)
-        tr_list.append(max(
-            highs[i] - lows[i],
-            abs(highs[i] - closes[i - 1]),
-            abs(lows[i] - closes[i - 1]),
-        ))
-
-    if len(tr_list) < period:
-        return {"adx": 25.0, "plus_di": 50.0, "minus_di": 50.0}
+    tr_list = true_range(highs, lows, closes)[1:]
 
     # Wilder smoothing
     def smooth(arr):
-        s = [sum(arr[:period])]
-        for val in arr[period:]:
-            s.append(s[-1] - s[-1] / period + val)
-        return s
+        return list(accumulate(islice(arr, period, None),
+                               lambda prev, val: prev - prev / period + val,
+                               initial=sum(arr[:period])))
 
     str_list = smooth(tr_list)
     sp_dm = smooth(plus_dm)
@@ -322,15 +363,18 @@ def volume_sma(volumes: List[float], period: Optional[int] = None) -> float:
     return sma_last(volumes, period)
 
 
-def volume_ratio(volumes: List[float], period: Optional[int] = None) -> float:
-    """Current volume / average volume."""
-    avg = volume_sma(volumes, period)
+def volume_ratio(volumes: List[float], period: Optional[int] = None,
+                 avg: Optional[float] = None) -> float:
+    """Current volume / average volume (*avg* skips recomputing the SMA)."""
+    if avg is None:
+        avg = volume_sma(volumes, period)
     return volumes[-1] / avg if avg else 1.0
 
 
-def is_volume_spike(volumes: List[float], threshold: Optional[float] = None) -> bool:
+def is_volume_spike(volumes: List[float], threshold: Optional[float] = None,
+                    avg: Optional[float] = None) -> bool:
     threshold = threshold or config.VOLUME_SPIKE_THRESHOLD
-    return volume_ratio(volumes) >= threshold
+    return volume_ratio(volumes, avg=avg) >= threshold
 
 
 def volume_trend(volumes: List[float], lookback: int = 10) -> str:
@@ -351,23 +395,366 @@ def volume_trend(volumes: List[float], lookback: int = 10) -> str:
 # Composite helpers
 # ═══════════════════════════════════════════════════════════════════════════
 
-def compute_all(ohlcv: Dict) -> Dict:
-    """Run every indicator on one OHLCV dict; return a flat results dict."""
+class StreamingIndicators:
+    """
+    Every compute_raw() indicator maintained incrementally, one bar at a time.
+
+    Running EMAs, Wilder smoothers, OBV and the VWAP sums are O(1) per bar;
+    only the windowed indicators (SMAs, Bollinger, Stochastic, volume) keep a
+    deque of their last *period* values.  Feeding a whole OHLCV dict through
+    update() gives the same numbers as the list-based functions above.
+    """
+
+    def __init__(self):
+        self._sma_periods = (config.SMA_FAST, config.SMA_MID, config.SMA_SLOW)
+        self._bb_period = config.BB_PERIOD
+        self._rsi_period = config.RSI_PERIOD
+        self._atr_period = config.ATR_PERIOD
+        self._adx_period = 14
+        self._stoch_period = 14
+        self._vol_period = config.VOLUME_MA_PERIOD
+        self._ema_k = {
+            "ema_fast": 2 / (config.EMA_FAST + 1),
+            "ema_slow": 2 / (config.EMA_SLOW + 1),
+            "macd_fast": 2 / (config.MACD_FAST + 1),
+            "macd_slow": 2 / (config.MACD_SLOW + 1),
+            "macd_signal": 2 / (config.MACD_SIGNAL + 1),
+        }
+
+        self.n = 0
+        self._closes = deque(maxlen=max(self._sma_periods + (self._bb_period,)))
+        self._volumes = deque(maxlen=max(self._vol_period, 10))
+        self._prev_high = self._prev_low = self._prev_close = 0.0
+        self._ema: Dict[str, float] = {}
+
+        # RSI: plain sums until the seed window is full, Wilder after
+        self._gain = self._loss = 0.0
+        # ATR over every bar's true range, same seeding
+        self._atr = 0.0
+        # ADX: smoothed TR/+DM/-DM, then DX sums or the smoothed ADX
+        self._adx_moves = 0
+        self._s_tr = self._s_pdm = self._s_mdm = 0.0
+        self._plus_di = self._minus_di = 0.0
+        self._dx_count = 0
+        self._adx = 0.0
+
+        # Stochastic: monotonic deques of (bar index, value) for the window
+        self._win_high: deque = deque()
+        self._win_low: deque = deque()
+        self._stoch_k: deque = deque(maxlen=3)
+
+        self._obv = 0.0
+        self._obv_hist = deque(maxlen=20)
+        self._tp_vol = 0.0
+        self._total_vol = 0.0
+
+    def _ema_step(self, name: str, value: float):
+        k = self._ema_k[name]
+        prev = self._ema.get(name)
+        self._ema[name] = value if prev is None else value * k + prev * (1 - k)
+
+    def update(self, high: float, low: float, close: float, volume: float):
+        """Fold one bar into every indicator."""
+        i = self.n
+        self.n += 1
+        prev_close = self._prev_close
+
+        self._closes.append(close)
+        self._volumes.append(volume)
+
+        self._ema_step("ema_fast", close)
+        self._ema_step("ema_slow", close)
+        self._ema_step("macd_fast", close)
+        self._ema_step("macd_slow", close)
+        self._ema_step("macd_signal", self._ema["macd_fast"] - self._ema["macd_slow"])
+
+        # True range (first bar has no previous close)
+        if i == 0:
+            tr = high - low
+        else:
+            tr = high - low
+            hc = high - prev_close if high > prev_close else prev_close - high
+            lc = low - prev_close if low > prev_close else prev_close - low
+            if hc > tr:
+                tr = hc
+            if lc > tr:
+                tr = lc
+
+        p = self._atr_period
+        if i < p:
+            self._atr += tr
+        else:
+            if i == p:
+                self._atr /= p
+            self._atr = (self._atr * (p - 1) + tr) / p
+
+        if i > 0:
+            self._update_rsi(close - prev_close)
+            self._update_adx(high, low, tr)
+            if close > prev_close:
+                self._obv += volume
+            elif close < prev_close:
+                self._obv -= volume
+        self._obv_hist.append(self._obv)
+
+        self._tp_vol += ((high + low + close) / 3) * volume
+        self._total_vol += volume
+
+        self._update_stoch(i, high, low, close)
+
+        self._prev_high, self._prev_low, self._prev_close = high, low, close
+
+    def _update_rsi(self, delta: float):
+        p = self._rsi_period
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        m = self.n - 1                  # deltas seen, including this one
+        if m <= p:
+            self._gain += gain
+            self._loss += loss
+        else:
+            if m == p + 1:
+                self._gain /= p
+                self._loss /= p
+            self._gain = (self._gain * (p - 1) + gain) / p
+            self._loss = (self._loss * (p - 1) + loss) / p
+
+    def _update_adx(self, high: float, low: float, tr: float):
+        p = self._adx_period
+        up = high - self._prev_high
+        down = self._prev_low - low
+        pdm = up if up > down and up > 0 else 0
+        mdm = down if down > up and down > 0 else 0
+
+        self._adx_moves += 1
+        if self._adx_moves <= p:
+            self._s_tr += tr
+            self._s_pdm += pdm
+            self._s_mdm += mdm
+            if self._adx_moves < p:
+                return
+        else:
+            self._s_tr = self._s_tr - self._s_tr / p + tr
+            self._s_pdm = self._s_pdm - self._s_pdm / p + pdm
+            self._s_mdm = self._s_mdm - self._s_mdm / p + mdm
+
+        t = self._s_tr
+        plus_di = (100 * self._s_pdm / t) if t != 0 else 0
+        minus_di = (100 * self._s_mdm / t) if t != 0 else 0
+        dx = (abs(plus_di - minus_di) / (plus_di + minus_di) * 100
+              if (plus_di + minus_di) != 0 else 0)
+        self._plus_di, self._minus_di = plus_di, minus_di
+
+        self._dx_count += 1
+        if self._dx_count <= p:
+            self._adx += dx
+        else:
+            if self._dx_count == p + 1:
+                self._adx /= p
+            self._adx = (self._adx * (p - 1) + dx) / p
+
+    def _update_stoch(self, i: int, high: float, low: float, close: float):
+        win_high, win_low = self._win_high, self._win_low
+        while win_high and win_high[-1][1] <= high:
+            win_high.pop()
+        win_high.append((i, high))
+        while win_low and win_low[-1][1] >= low:
+            win_low.pop()
+        win_low.append((i, low))
+        start = i - self._stoch_period + 1
+        while win_high[0][0] < start:
+            win_high.popleft()
+        while win_low[0][0] < start:
+            win_low.popleft()
+
+        h, l = win_high[0][1], win_low[0][1]
+        self._stoch_k.append(50.0 if h == l else (close - l) / (h - l) * 100)
+
+    # ── Results ──────────────────────────────────────────────────────────
+
+    def _sma(self, window: deque, period: int) -> float:
+        if len(window) < period:
+            return sum(window) / len(window)
+        return sum(islice(window, len(window) - period, None)) / period
+
+    def _bb(self) -> Dict[str, float]:
+        period = self._bb_period
+        nan = float("nan")
+        if len(self._closes) < period:
+            upper = middle = lower = nan
+        else:
+            window = list(islice(self._closes, len(self._closes) - period, None))
+            middle = sum(window) / period
+            variance = sum((x - middle) ** 2 for x in window) / period
+            band = config.BB_STD * math.sqrt(variance)
+            upper, lower = middle + band, middle - band
+        spread = upper - lower
+        return {
+            "upper": upper,
+            "middle": middle,
+            "lower": lower,
+            "width": spread / middle * 100,
+            "pct_b": (self._prev_close - lower) / spread if spread != 0 else 0.5,
+        }
+
+    def _rsi(self) -> float:
+        p = self._rsi_period
+        if self.n - 1 <= p:
+            avg_gain, avg_loss = self._gain / p, self._loss / p
+        else:
+            avg_gain, avg_loss = self._gain, self._loss
+        if avg_loss == 0:
+            return 100.0
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+    def _adx_values(self) -> Dict[str, float]:
+        p = self._adx_period
+        if self._adx_moves < p:
+            return {"adx": 25.0, "plus_di": 50.0, "minus_di": 50.0}
+        if self._dx_count < p:
+            adx_val = self._adx / self._dx_count
+        elif self._dx_count == p:
+            adx_val = self._adx / p
+        else:
+            adx_val = self._adx
+        return {
+            "adx": round(adx_val, 1),
+            "plus_di": round(self._plus_di, 1),
+            "minus_di": round(self._minus_di, 1),
+        }
+
+    def _obv_trend(self) -> str:
+        hist = self._obv_hist
+        if self.n < hist.maxlen:
+            return "neutral"
+        first = hist[0]
+        slope = (hist[-1] - first) / abs(first) if first != 0 else 0
+        if slope > 0.05:
+            return "rising"
+        elif slope < -0.05:
+            return "falling"
+        return "flat"
+
+    def _vol_trend(self, lookback: int = 10) -> str:
+        if len(self._volumes) < lookback:
+            return "unknown"
+        recent = list(islice(self._volumes, len(self._volumes) - lookback, None))
+        half = lookback // 2
+        first_half = sum(recent[:half]) / half
+        second_half = sum(recent[half:]) / half
+        ratio = second_half / first_half if first_half else 1.0
+        if ratio > 1.2:
+            return "increasing"
+        elif ratio < 0.8:
+            return "decreasing"
+        return "stable"
+
+    def values(self) -> Dict:
+        """The compute_raw(full=True) dict for the bars seen so far."""
+        ema = self._ema
+        macd_val = ema["macd_fast"] - ema["macd_slow"]
+        p = self._atr_period
+        atr_val = self._atr / p if self.n <= p else self._atr
+
+        avg_vol = self._sma(self._volumes, self._vol_period)
+        vol_ratio = self._volumes[-1] / avg_vol if avg_vol else 1.0
+        k_vals = self._stoch_k
+
+        return {
+            "price": self._prev_close,
+            "sma_fast": self._sma(self._closes, self._sma_periods[0]),
+            "sma_mid": self._sma(self._closes, self._sma_periods[1]),
+            "sma_slow": self._sma(self._closes, self._sma_periods[2]),
+            "rsi": self._rsi(),
+            "macd": {
+                "macd": macd_val,
+                "signal": ema["macd_signal"],
+                "histogram": macd_val - ema["macd_signal"],
+            },
+            "adx": self._adx_values(),
+            "ema_fast": ema["ema_fast"],
+            "ema_slow": ema["ema_slow"],
+            "bb": self._bb(),
+            "atr": atr_val,
+            "stoch": {
+                "k": k_vals[-1],
+                "d": sum(k_vals) / 3 if len(k_vals) == 3 else float("nan"),
+            },
+            "vwap": self._tp_vol / self._total_vol if self._total_vol else self._prev_close,
+            "vol_ratio": vol_ratio,
+            "vol_spike": vol_ratio >= config.VOLUME_SPIKE_THRESHOLD,
+            "vol_trend": self._vol_trend(),
+            "obv_trend": self._obv_trend(),
+        }
+
+    def copy(self) -> "StreamingIndicators":
+        """Independent copy, so a partial bar can be added without touching self."""
+        clone = copy.copy(self)
+        clone._closes = self._closes.copy()
+        clone._volumes = self._volumes.copy()
+        clone._ema = dict(self._ema)
+        clone._win_high = self._win_high.copy()
+        clone._win_low = self._win_low.copy()
+        clone._stoch_k = self._stoch_k.copy()
+        clone._obv_hist = self._obv_hist.copy()
+        return clone
+
+    @classmethod
+    def from_ohlcv(cls, ohlcv: Dict, bars: Optional[int] = None) -> "StreamingIndicators":
+        """Stream an OHLCV dict (or just its first *bars* bars) through a fresh instance."""
+        state = cls()
+        update = state.update
+        rows = zip(ohlcv["high"], ohlcv["low"], ohlcv["close"], ohlcv["volume"])
+        for bar in islice(rows, bars):
+            update(*bar)
+        return state
+
+
+def compute_raw(ohlcv: Dict, full: bool = True) -> Dict:
+    """
+    Unrounded indicator values for one OHLCV dict.
+
+    The trend set (SMAs, RSI, MACD, ADX) is always computed — that is all the
+    higher-timeframe trend pass needs.  With *full* the remaining indicators
+    are added so one call can feed compute_all, the level finder and the
+    money-flow analysis without any of them recomputing.  The full set comes
+    from a single StreamingIndicators pass over the bars.
+    """
+    if full:
+        return StreamingIndicators.from_ohlcv(ohlcv).values()
+
     c = ohlcv["close"]
     h = ohlcv["high"]
     l = ohlcv["low"]
-    v = ohlcv["volume"]
+    return {
+        "price": c[-1],
+        "sma_fast": sma_last(c, config.SMA_FAST),
+        "sma_mid": sma_last(c, config.SMA_MID),
+        "sma_slow": sma_last(c, config.SMA_SLOW),
+        "rsi": rsi_last(c),
+        "macd": macd_last(c),
+        "adx": adx(h, l, c),
+    }
+
 
-    _rsi = rsi_last(c)
-    _macd = macd_last(c)
-    _bb = bb_last(c)
-    _atr = atr_last(h, l, c)
-    _stoch = stochastic_last(h, l, c)
-    _adx = adx(h, l, c)
-    _vwap = vwap(h, l, c, v)
+def compute_all(ohlcv: Dict, raw: Optional[Dict] = None) -> Dict:
+    """
+    Run every indicator on one OHLCV dict; return a flat results dict.
+
+    Pass *raw* (from compute_raw) to reuse values that were already computed.
+    """
+    raw = raw or compute_raw(ohlcv)
+    price = raw["price"]
+    _rsi = raw["rsi"]
+    _macd = raw["macd"]
+    _bb = raw["bb"]
+    _atr = raw["atr"]
+    _stoch = raw["stoch"]
+    _adx = raw["adx"]
+    _vwap = raw["vwap"]
 
     return {
-        "price": c[-1],
+        "price": price,
         "rsi": round(_rsi, 1),
         "macd_line": round(_macd["macd"], 6),
         "macd_signal": round(_macd["signal"], 6),
@@ -378,21 +765,21 @@ def compute_all(ohlcv: Dict) -> Dict:
         "bb_width": round(_bb["width"], 2),
         "bb_pct_b": round(_bb["pct_b"], 3),
         "atr": round(_atr, 4),
-        "atr_pct": round(_atr / c[-1] * 100, 2),
+        "atr_pct": round(_atr / price * 100, 2),
         "stoch_k": round(_stoch["k"], 1),
         "stoch_d": round(_stoch["d"], 1),
         "adx": _adx["adx"],
         "plus_di": _adx["plus_di"],
         "minus_di": _adx["minus_di"],
         "vwap": round(_vwap, 2),
-        "price_vs_vwap": round((c[-1] - _vwap) / _vwap * 100, 2),
-        "sma_9": round(sma_last(c, config.SMA_FAST), 2),
-        "sma_21": round(sma_last(c, config.SMA_MID), 2),
-        "sma_50": round(sma_last(c, config.SMA_SLOW), 2),
-        "ema_12": round(ema_last(c, config.EMA_FAST), 2),
-        "ema_26": round(ema_last(c, config.EMA_SLOW), 2),
-        "vol_ratio": round(volume_ratio(v), 2),
-        "vol_spike": is_volume_spike(v),
-        "vol_trend": volume_trend(v),
-        "obv_trend": obv_trend(c, v),
+        "price_vs_vwap": round((price - _vwap) / _vwap * 100, 2),
+        "sma_9": round(raw["sma_fast"], 2),
+        "sma_21": round(raw["sma_mid"], 2),
+        "sma_50": round(raw["sma_slow"], 2),
+        "ema_12": round(raw["ema_fast"], 2),
+        "ema_26": round(raw["ema_slow"], 2),
+        "vol_ratio": round(raw["vol_ratio"], 2),
+        "vol_spike": raw["vol_spike"],
+        "vol_trend": raw["vol_trend"],
+        "obv_trend": raw["obv_trend"],
     }
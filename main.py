@@ -6,10 +6,13 @@ money flow → signal scoring → scenario building → formatting.
 """
 import asyncio
 import logging
-from typing import Dict
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
 
+import config
+from cache_manager import CacheManager
 from crypto_analyzer import fetch_multi_tf
-from indicators import compute_all
+from indicators import compute_all, StreamingIndicators
 from patterns import detect_patterns
 from analysis_components import (
     find_key_levels,
@@ -23,6 +26,62 @@ from formatter import format_analysis
 
 logger = logging.getLogger(__name__)
 
+# (symbol, timeframe) → (first bar ts, last closed bar ts, indicator state
+# after the closed bars).  Only the still-open last candle changes between
+# requests until a new bar closes, so that is the only bar re-fed.
+_STATE_CACHE: "OrderedDict[Tuple[str, str], Tuple[int, Optional[int], StreamingIndicators]]" = OrderedDict()
+_STATE_CACHE_MAX = 512
+
+# Bounds exchange fan-out and worker-thread use when many users ask at once
+_ANALYSIS_SEM = asyncio.Semaphore(config.MAX_CONCURRENT_ANALYSES)
+
+# (symbol, timeframe) → recent analyze_coin_raw result, and the run still
+# in progress for a pair, so users asking for a hot pair share one run
+_RESULT_CACHE = CacheManager(ttl_seconds=config.ANALYSIS_CACHE_TTL_SECONDS, maxsize=512)
+_RESULT_INFLIGHT: Dict[Tuple[str, str], asyncio.Task] = {}
+
+
+def _primary_raw(symbol: str, timeframe: str, ohlcv: Dict) -> Dict:
+    """
+    compute_raw(ohlcv) for the primary timeframe, reusing the cached state
+    for the closed bars when the window has not moved since the last call.
+    Runs without awaiting, so concurrent requests cannot interleave here.
+    """
+    ts = ohlcv["timestamp"]
+    first_ts = ts[0]
+    closed_ts = ts[-2] if len(ts) > 1 else None
+    key = (symbol, timeframe)
+
+    cached = _STATE_CACHE.get(key)
+    if cached is not None and cached[0] == first_ts and cached[1] == closed_ts:
+        state = cached[2]
+        _STATE_CACHE.move_to_end(key)
+    else:
+        state = StreamingIndicators.from_ohlcv(ohlcv, bars=len(ts) - 1)
+        _STATE_CACHE[key] = (first_ts, closed_ts, state)
+        _STATE_CACHE.move_to_end(key)
+        if len(_STATE_CACHE) > _STATE_CACHE_MAX:
+            _STATE_CACHE.popitem(last=False)
+
+    live = state.copy()
+    live.update(ohlcv["high"][-1], ohlcv["low"][-1],
+                ohlcv["close"][-1], ohlcv["volume"][-1])
+    return live.values()
+
+
+async def _independent_steps(ohlcv: Dict, ohlcv_1h: Dict, ohlcv_4h: Dict,
+                             raw: Dict) -> Tuple:
+    """
+    Patterns, levels, multi-TF trend and money flow only read the OHLCV and
+    the shared raw indicators, so they run concurrently off the event loop.
+    """
+    return await asyncio.gather(
+        asyncio.to_thread(detect_patterns, ohlcv),
+        asyncio.to_thread(find_key_levels, ohlcv, ind=raw),
+        asyncio.to_thread(analyze_trend_mtf, ohlcv, ohlcv_1h, ohlcv_4h, raw),
+        asyncio.to_thread(analyze_money_flow, ohlcv, ohlcv_1h, ohlcv_4h, raw),
+    )
+
 
 async def analyze_coin(symbol: str, timeframe: str = "15m") -> str:
     """
@@ -39,60 +98,58 @@ async def analyze_coin(symbol: str, timeframe: str = "15m") -> str:
     9. Get session context
     10. Format everything into a rich Telegram message
     """
-    # 1 — Data
-    data = await fetch_multi_tf(symbol, timeframe)
-    ohlcv = data["primary"]
-    ohlcv_1h = data["1h"]
-    ohlcv_4h = data["4h"]
-
-    # 2 — Indicators
-    indicators = compute_all(ohlcv)
-
-    # 3 — Candle patterns
-    patterns = detect_patterns(ohlcv)
-
-    # 4 — Levels
-    levels = find_key_levels(ohlcv)
-
-    # 5 — Multi-TF trend
-    trend = analyze_trend_mtf(ohlcv, ohlcv_1h, ohlcv_4h)
-
-    # 6 — Money flow
-    flow = analyze_money_flow(ohlcv, ohlcv_1h, ohlcv_4h)
-
-    # 7 — Signal score
-    signal = compute_signal(indicators, levels, trend, flow, patterns)
-
-    # 8 — Scenarios
-    scenarios = build_scenarios(indicators, levels, trend, flow, patterns)
-
-    # 9 — Session
-    session = get_session_context()
+    r = await analyze_coin_raw(symbol, timeframe)
 
     # 10 — Format
     return format_analysis(
-        symbol, timeframe, indicators, levels, trend, flow,
-        scenarios, patterns, signal, session,
+        symbol, timeframe, r["indicators"], r["levels"], r["trend"], r["flow"],
+        r["scenarios"], r["patterns"], r["signal"], r["session"],
     )
 
 
 async def analyze_coin_raw(symbol: str, timeframe: str = "15m") -> Dict:
-    """Return raw analysis data (for programmatic use)."""
-    data = await fetch_multi_tf(symbol, timeframe)
-    ohlcv = data["primary"]
-    ohlcv_1h = data["1h"]
-    ohlcv_4h = data["4h"]
-
-    indicators = compute_all(ohlcv)
-    patterns = detect_patterns(ohlcv)
-    levels = find_key_levels(ohlcv)
-    trend = analyze_trend_mtf(ohlcv, ohlcv_1h, ohlcv_4h)
-    flow = analyze_money_flow(ohlcv, ohlcv_1h, ohlcv_4h)
+    """
+    Return raw analysis data (steps 1-9 of analyze_coin, for programmatic
+    use).  Results are reused for ANALYSIS_CACHE_TTL_SECONDS, and callers
+    asking for the same pair while it is being computed share that run.
+    The result is shared, so treat it as read-only.
+    """
+    key = (symbol, timeframe)
+    cached = _RESULT_CACHE.get(key)
+    if cached is not None:
+        return cached
+    task = _RESULT_INFLIGHT.get(key)
+    if task is None:
+        task = asyncio.create_task(_run_pipeline(symbol, timeframe))
+        _RESULT_INFLIGHT[key] = task
+        task.add_done_callback(lambda _: _RESULT_INFLIGHT.pop(key, None))
+    # shielded: one caller giving up must not cancel the run for the others
+    return await asyncio.shield(task)
+
+
+async def _run_pipeline(symbol: str, timeframe: str) -> Dict:
+    """Steps 1-9; at most config.MAX_CONCURRENT_ANALYSES run at once."""
+    async with _ANALYSIS_SEM:
+        # 1 — Data (primary + 1h + 4h in parallel)
+        data = await fetch_multi_tf(symbol, timeframe)
+        ohlcv = data["primary"]
+        ohlcv_1h = data["1h"]
+        ohlcv_4h = data["4h"]
+
+        # 2 — Indicators (raw values are shared with the level / trend / flow steps)
+        raw = _primary_raw(symbol, timeframe, ohlcv)
+        indicators = compute_all(ohlcv, raw)
+
+        # 3-6 — Candle patterns, levels, multi-TF trend, money flow
+        patterns, levels, trend, flow = await _independent_steps(
+            ohlcv, ohlcv_1h, ohlcv_4h, raw)
+
+    # 7-9 — Signal score, scenarios, session
     signal = compute_signal(indicators, levels, trend, flow, patterns)
     scenarios = build_scenarios(indicators, levels, trend, flow, patterns)
     session = get_session_context()
 
-    return {
+    result = {
         "symbol": symbol,
         "timeframe": timeframe,
         "indicators": indicators,
@@ -104,6 +161,8 @@ async def analyze_coin_raw(symbol: str, timeframe: str = "15m") -> Dict:
         "scenarios": scenarios,
         "session": session,
     }
+    _RESULT_CACHE.set((symbol, timeframe), result)
+    return result
 
 
 if __name__ == "__main__":
@@ -1,14 +1,35 @@
 """
 Multi-exchange client — singleton with built-in caching.
 """
+import asyncio
+import os
+import re
+import time
+import aiohttp
 import ccxt.async_support as ccxt
-from typing import Dict, Optional
+import orjson
+from array import array
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional, Union
 from cache_manager import CacheManager
 import config
 import logging
 
 logger = logging.getLogger(__name__)
 
+_CRYPTO_RE = re.compile(r"USDT|/BTC|/ETH")
+_FOREX_RE = re.compile(r"EUR|GBP|JPY|AUD|CAD|CHF|NZD|XAU|XAG|TRY|BRL")
+_STOCK_MAP = {
+    "AAPL": "AAPLUSDT", "TSLA": "TSLAUSDT",
+    "COIN": "COINUSDT", "MSTR": "MSTRUSDT",
+}
+
+
+@lru_cache(maxsize=4096)
+def _is_stock(symbol: str) -> bool:
+    return not _CRYPTO_RE.search(symbol) and not _FOREX_RE.search(symbol) and "/" not in symbol
+
 
 class MultiExchangeClient:
     """Manages exchange connections with caching and proper lifecycle."""
@@ -25,29 +46,163 @@ class MultiExchangeClient:
         if self._initialized:
             return
         self._initialized = True
+        # One instance per process (see crypto_analyzer.get_client); any
+        # further ccxt exchange added here needs the same rate limiting and
+        # explicit timeout
         self.binance = ccxt.binance({
             "enableRateLimit": True,
+            "timeout": config.EXCHANGE_TIMEOUT_MS,
             "options": {"defaultType": "spot"},
         })
         self._cache = CacheManager(ttl_seconds=config.CACHE_TTL_SECONDS)
         self._markets_loaded = False
+        self._markets_lock = asyncio.Lock()
+        # Listed symbol names, rebuilt whenever markets are (re)loaded
+        self._symbols: frozenset = frozenset()
+        # cache key → background refresh task for entries served stale
+        self._refresh_inflight: Dict[str, asyncio.Task] = {}
+        # cache key → exchange request in progress, shared by every caller
+        self._inflight: Dict[str, asyncio.Task] = {}
 
     async def _ensure_markets(self):
-        if not self._markets_loaded:
-            await self.binance.load_markets()
+        if self._markets_loaded:
+            return
+        async with self._markets_lock:
+            if self._markets_loaded:
+                return
+            self._open_session()
+            if not await asyncio.to_thread(self._load_markets_from_disk):
+                await self.binance.load_markets()
+                await asyncio.to_thread(self._save_markets_to_disk)
+            self._symbols = frozenset(self.binance.markets)
+            self._markets_loaded = True
+
+    async def refresh_markets(self):
+        """Reload markets from the exchange and rewrite the disk copy."""
+        async with self._markets_lock:
+            self._open_session()
+            await self.binance.load_markets(reload=True)
+            await asyncio.to_thread(self._save_markets_to_disk)
+            self._symbols = frozenset(self.binance.markets)
             self._markets_loaded = True
 
+    async def has_symbol(self, symbol: str) -> bool:
+        """Whether Binance lists symbol (loads markets on first use)."""
+        await self._ensure_markets()
+        return symbol in self._symbols
+
+    def _open_session(self):
+        """
+        Give ccxt an HTTP session tuned for a long-lived bot: DNS answers
+        cached and idle connections kept open longer than aiohttp's
+        defaults, so sporadic requests reuse the TLS connection.  Must run
+        on the event loop; ccxt still owns and closes the session.
+        """
+        ex = self.binance
+        if ex.session is not None:
+            return
+        # Let ccxt bind its loop and build its SSL context, but not a session
+        ex.own_session = False
+        ex.open()
+        ex.own_session = True
+        ex.tcp_connector = aiohttp.TCPConnector(
+            ssl=ex.ssl_context, limit=config.HTTP_POOL_LIMIT,
+            ttl_dns_cache=config.HTTP_DNS_CACHE_SECONDS,
+            keepalive_timeout=config.HTTP_KEEPALIVE_SECONDS,
+            enable_cleanup_closed=True,
+        )
+        ex.session = aiohttp.ClientSession(connector=ex.tcp_connector,
+                                           trust_env=ex.aiohttp_trust_env)
+
+    def _load_markets_from_disk(self) -> bool:
+        """Install markets saved by a previous run if they are recent enough."""
+        path = config.MARKETS_CACHE_PATH
+        try:
+            if time.time() - os.path.getmtime(path) > config.MARKETS_CACHE_TTL_SECONDS:
+                return False
+            with open(path, "rb") as f:
+                saved = orjson.loads(f.read())
+            self.binance.set_markets(saved["markets"], saved["currencies"])
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning("Ignoring markets cache %s: %s", path, e)
+            return False
+        logger.info("Loaded %d markets from %s", len(self.binance.markets), path)
+        return True
+
+    def _save_markets_to_disk(self):
+        path = config.MARKETS_CACHE_PATH
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(orjson.dumps({"markets": self.binance.markets,
+                                      "currencies": self.binance.currencies}))
+            os.replace(tmp, path)
+        except Exception as e:
+            logger.warning("Could not save markets cache %s: %s", path, e)
+
     async def fetch_ohlcv(self, symbol: str, timeframe: str = "15m",
-                          limit: int = None) -> Dict:
-        """Fetch OHLCV with caching."""
+                          limit: int = None, max_age: float = None) -> Mapping:
+        """
+        Fetch OHLCV with caching.  The result is the cached mapping itself
+        (read-only, shared by every caller); copy it before changing it.
+        With max_age, cached data older than that many seconds is refetched
+        even within its TTL.
+        """
         limit = limit or config.DEFAULT_LOOKBACK
-        cache_key = f"{symbol}:{timeframe}:{limit}"
+        cache_key = self._cache_key(symbol, timeframe, limit)
 
-        cached = self._cache.get(cache_key)
+        cached = self._cached(cache_key, symbol, timeframe, limit, max_age)
         if cached is not None:
             logger.debug("Cache hit: %s", cache_key)
             return cached
+        return await self._fetch(cache_key, symbol, timeframe, limit)
+
+    def _cached(self, cache_key: str, symbol: str, timeframe: str,
+                limit: int, max_age: float = None) -> Optional[Mapping]:
+        """
+        Stale-while-revalidate lookup: data within the TTL is returned as
+        is; data up to CACHE_GRACE_SECONDS past it is returned too, with a
+        background refresh scheduled.  None means the caller must fetch.
+        """
+        hit = self._cache.get_with_age(cache_key, grace=config.CACHE_GRACE_SECONDS)
+        if hit is None:
+            return None
+        data, overdue = hit
+        if max_age is not None and overdue + self._ttl_for(timeframe) > max_age:
+            return None  # older than this caller accepts
+        if overdue >= 0 and cache_key not in self._refresh_inflight:
+            self._refresh_inflight[cache_key] = asyncio.create_task(
+                self._refresh(cache_key, symbol, timeframe, limit))
+        return data
+
+    async def _refresh(self, cache_key: str, symbol: str, timeframe: str,
+                       limit: int):
+        try:
+            await self._fetch(cache_key, symbol, timeframe, limit)
+        except ValueError as e:
+            logger.warning("Background refresh of %s failed: %s", cache_key, e)
+        finally:
+            self._refresh_inflight.pop(cache_key, None)
+
+    async def _fetch(self, cache_key: str, symbol: str, timeframe: str,
+                     limit: int) -> Mapping:
+        """
+        Fetch from the exchange and cache the result.  Concurrent callers
+        for the same key share one request; it is shielded so a cancelled
+        caller does not abort it for the others.
+        """
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(self._download(cache_key, symbol, timeframe, limit))
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        return await asyncio.shield(task)
 
+    async def _download(self, cache_key: str, symbol: str, timeframe: str,
+                        limit: int) -> Mapping:
         try:
             if self.is_stock(symbol):
                 symbol = self.convert_stock_symbol(symbol)
@@ -58,15 +213,21 @@ class MultiExchangeClient:
             if not ohlcv:
                 raise ValueError(f"No data returned for {symbol}")
 
-            data = {
-                "timestamp": [x[0] for x in ohlcv],
-                "open": [x[1] for x in ohlcv],
-                "high": [x[2] for x in ohlcv],
-                "low": [x[3] for x in ohlcv],
-                "close": [x[4] for x in ohlcv],
-                "volume": [x[5] for x in ohlcv],
-            }
-            self._cache.set(cache_key, data)
+            # Packed arrays: a quarter of the memory of lists of boxed
+            # floats, and they slice/iterate like lists for the indicators
+            ts, o, h, l, c, v = zip(*ohlcv)
+            if None in v:  # some candles come back without a volume
+                v = [0.0 if x is None else x for x in v]
+            tc = config.OHLCV_TYPECODE
+            data = MappingProxyType({
+                "timestamp": array("q", ts),
+                "open": array(tc, o),
+                "high": array(tc, h),
+                "low": array(tc, l),
+                "close": array(tc, c),
+                "volume": array(tc, v),
+            })
+            self._cache.set(cache_key, data, ttl=self._ttl_for(timeframe))
             return data
 
         except ccxt.BadSymbol:
@@ -84,25 +245,93 @@ class MultiExchangeClient:
                 raise ValueError(f"Symbol {symbol} not available.")
             raise ValueError(f"API error: {error_msg}")
 
+    async def fetch_ohlcv_many(self, symbols: Iterable[str], timeframe: str = "15m",
+                               limit: int = None) -> Dict[str, Union[Mapping, Exception]]:
+        """
+        fetch_ohlcv for many symbols concurrently, at most
+        config.MAX_CONCURRENT_FETCHES requests in flight.  Cached symbols
+        skip the queue.  Maps each symbol to its data or the raised error.
+        """
+        limit = limit or config.DEFAULT_LOOKBACK
+        symbols = list(dict.fromkeys(symbols))
+        sem = asyncio.Semaphore(config.MAX_CONCURRENT_FETCHES)
+
+        async def _one(symbol: str):
+            cached = self._cached(self._cache_key(symbol, timeframe, limit),
+                                  symbol, timeframe, limit)
+            if cached is not None:
+                return cached
+            async with sem:
+                return await self.fetch_ohlcv(symbol, timeframe, limit)
+
+        results = await asyncio.gather(*(_one(s) for s in symbols),
+                                       return_exceptions=True)
+        return dict(zip(symbols, results))
+
+    async def warmup(self, symbols: Iterable[str], timeframes: Iterable[str]):
+        """
+        Load markets and fill the OHLCV cache for the given symbols so the
+        first requests for them are cache hits.  With no symbols only the
+        markets are loaded.  Failures are only logged.
+        """
+        symbols = list(symbols)
+        try:
+            await self._ensure_markets()
+        except Exception as e:
+            logger.warning("Warmup skipped, markets not loaded: %s", e)
+            return
+        if not symbols:
+            return
+        for timeframe in timeframes:
+            results = await self.fetch_ohlcv_many(symbols, timeframe)
+            failed = [s for s, r in results.items() if isinstance(r, Exception)]
+            if failed:
+                logger.warning("Warmup %s failed for %s", timeframe, ", ".join(failed))
+        logger.info("Warmed OHLCV cache for %d symbols", len(symbols))
+
+    @staticmethod
+    def _ttl_for(timeframe: str) -> float:
+        return config.CACHE_TTL_BY_TIMEFRAME.get(timeframe, config.CACHE_TTL_SECONDS)
+
+    @staticmethod
+    def _cache_key(symbol: str, timeframe: str, limit: int) -> str:
+        return f"{symbol}:{timeframe}:{limit}"
+
+    async def fetch_last_prices(self, symbols) -> Dict[str, float]:
+        """
+        Last traded price for many symbols in one tickers request.
+        Keyed by the symbols as passed in; symbols the exchange did not
+        return are simply absent.
+        """
+        wanted = {
+            (self.convert_stock_symbol(s) if self.is_stock(s) else s): s
+            for s in symbols
+        }
+        try:
+            await self._ensure_markets()
+            tickers = await self.binance.fetch_tickers(list(wanted))
+        except Exception as e:
+            logger.warning("Batch tickers fetch failed: %s", e)
+            return {}
+        return {
+            wanted[sym]: t["last"]
+            for sym, t in tickers.items()
+            if sym in wanted and t.get("last")
+        }
+
     # ── Symbol classification ─────────────────────────────────────────
 
     def is_crypto(self, symbol: str) -> bool:
-        return "USDT" in symbol or "/BTC" in symbol or "/ETH" in symbol
+        return _CRYPTO_RE.search(symbol) is not None
 
     def is_forex(self, symbol: str) -> bool:
-        forex = ["EUR", "GBP", "JPY", "AUD", "CAD", "CHF", "NZD",
-                 "XAU", "XAG", "TRY", "BRL"]
-        return any(p in symbol for p in forex)
+        return _FOREX_RE.search(symbol) is not None
 
     def is_stock(self, symbol: str) -> bool:
-        return not self.is_crypto(symbol) and not self.is_forex(symbol) and "/" not in symbol
+        return _is_stock(symbol)
 
     def convert_stock_symbol(self, symbol: str) -> str:
-        stock_map = {
-            "AAPL": "AAPLUSDT", "TSLA": "TSLAUSDT",
-            "COIN": "COINUSDT", "MSTR": "MSTRUSDT",
-        }
-        return stock_map.get(symbol, f"{symbol}USDT")
+        return _STOCK_MAP.get(symbol, f"{symbol}USDT")
 
     async def close(self):
         """Close exchange connections and reset singleton."""
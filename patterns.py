@@ -1,186 +1,216 @@
 """
 Candlestick pattern recognition.
 
-Each detector returns a dict with:
+Each detected pattern is reported as a dict with:
   name      – human-readable pattern name
   bias      – "bullish" | "bearish" | "neutral"
   strength  – 1 (weak) … 3 (strong)
   index     – bar index where detected
+  bars_ago  – how many bars before the latest one
 
 We scan the last N candles and return all detected patterns sorted by
 recency (most recent first).
 """
-from typing import Dict, List, Optional
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
+# Detectors look back at most this many bars before the bar they test
+_MAX_LOOKBEHIND = 3
 
-def _body(o: float, c: float) -> float:
-    return abs(c - o)
 
-
-def _upper_shadow(h: float, o: float, c: float) -> float:
-    return h - max(o, c)
-
-
-def _lower_shadow(l: float, o: float, c: float) -> float:
-    return min(o, c) - l
-
-
-def _range(h: float, l: float) -> float:
-    return h - l
-
-
-def _is_bullish(o: float, c: float) -> bool:
-    return c > o
-
-
-def _is_bearish(o: float, c: float) -> bool:
-    return o > c
+class _Bars(NamedTuple):
+    """
+    Column-wise candle features for the scanned window, computed once so the
+    detectors only index into them.
+    """
+    opens: List[float]
+    highs: List[float]
+    lows: List[float]
+    closes: List[float]
+    body: List[float]
+    rng: List[float]
+    upper: List[float]         # upper shadow
+    lower: List[float]         # lower shadow
+    bull: List[bool]
+    bear: List[bool]
+
+
+def _bars(opens, highs, lows, closes) -> _Bars:
+    tops = [o if o > c else c for o, c in zip(opens, closes)]
+    bottoms = [c if o > c else o for o, c in zip(opens, closes)]
+    return _Bars(
+        opens, highs, lows, closes,
+        body=[abs(c - o) for o, c in zip(opens, closes)],
+        rng=[h - l for h, l in zip(highs, lows)],
+        upper=[h - t for h, t in zip(highs, tops)],
+        lower=[b - l for b, l in zip(bottoms, lows)],
+        bull=[c > o for o, c in zip(opens, closes)],
+        bear=[o > c for o, c in zip(opens, closes)],
+    )
 
 
 # ═══════════════════════════════════════════════════════════════════════════
 # Individual pattern detectors
 # ═══════════════════════════════════════════════════════════════════════════
 
-def _detect_doji(o, h, l, c, i) -> Optional[Dict]:
+# (name, bias, strength) — detectors return one of these shared tuples, and
+# result dicts are only built for the patterns that survive deduplication.
+_DOJI = ("Doji", "neutral", 1)
+_HAMMER = ("Hammer", "bullish", 2)
+_HANGING_MAN = ("Hanging Man", "bearish", 2)
+_SHOOTING_STAR = ("Shooting Star", "bearish", 2)
+_INVERTED_HAMMER = ("Inverted Hammer", "bullish", 1)
+_BULLISH_ENGULFING = ("Bullish Engulfing", "bullish", 3)
+_BEARISH_ENGULFING = ("Bearish Engulfing", "bearish", 3)
+_MORNING_STAR = ("Morning Star", "bullish", 3)
+_EVENING_STAR = ("Evening Star", "bearish", 3)
+_THREE_WHITE_SOLDIERS = ("Three White Soldiers", "bullish", 3)
+_THREE_BLACK_CROWS = ("Three Black Crows", "bearish", 3)
+_TWEEZER_TOP = ("Tweezer Top", "bearish", 2)
+_TWEEZER_BOTTOM = ("Tweezer Bottom", "bullish", 2)
+_BULLISH_PIN_BAR = ("Bullish Pin Bar", "bullish", 2)
+_BEARISH_PIN_BAR = ("Bearish Pin Bar", "bearish", 2)
+
+
+def _detect_doji(b: _Bars, i: int) -> Optional[Tuple[str, str, int]]:
     """Doji — body is < 10% of total range."""
-    r = _range(h, l)
+    r = b.rng[i]
     if r == 0:
         return None
-    if _body(o, c) / r < 0.10:
-        return {"name": "Doji", "bias": "neutral", "strength": 1, "index": i}
+    if b.body[i] / r < 0.10:
+        return _DOJI
     return None
 
 
-def _detect_hammer(opens, highs, lows, closes, i) -> Optional[Dict]:
+def _detect_hammer(b: _Bars, i: int) -> Optional[Tuple[str, str, int]]:
     """Hammer / Hanging Man — small body at top, long lower shadow."""
-    o, h, l, c = opens[i], highs[i], lows[i], closes[i]
-    r = _range(h, l)
+    r = b.rng[i]
     if r == 0:
         return None
-    body = _body(o, c)
-    ls = _lower_shadow(l, o, c)
-    us = _upper_shadow(h, o, c)
-    if ls >= body * 2 and us < body * 0.5 and body / r < 0.35:
+    body = b.body[i]
+    if b.lower[i] >= body * 2 and b.upper[i] < body * 0.5 and body / r < 0.35:
         # Bullish hammer in downtrend, bearish hanging man in uptrend
+        closes = b.closes
         if i >= 3 and closes[i] < closes[i - 3]:
-            return {"name": "Hammer", "bias": "bullish", "strength": 2, "index": i}
+            return _HAMMER
         elif i >= 3 and closes[i] > closes[i - 3]:
-            return {"name": "Hanging Man", "bias": "bearish", "strength": 2, "index": i}
+            return _HANGING_MAN
     return None
 
 
-def _detect_shooting_star(opens, highs, lows, closes, i) -> Optional[Dict]:
+def _detect_shooting_star(b: _Bars, i: int) -> Optional[Tuple[str, str, int]]:
     """Shooting Star / Inverted Hammer — small body at bottom, long upper wick."""
-    o, h, l, c = opens[i], highs[i], lows[i], closes[i]
-    r = _range(h, l)
+    r = b.rng[i]
     if r == 0:
         return None
-    body = _body(o, c)
-    us = _upper_shadow(h, o, c)
-    ls = _lower_shadow(l, o, c)
-    if us >= body * 2 and ls < body * 0.5 and body / r < 0.35:
+    body = b.body[i]
+    if b.upper[i] >= body * 2 and b.lower[i] < body * 0.5 and body / r < 0.35:
+        closes = b.closes
         if i >= 3 and closes[i] > closes[i - 3]:
-            return {"name": "Shooting Star", "bias": "bearish", "strength": 2, "index": i}
+            return _SHOOTING_STAR
         elif i >= 3 and closes[i] < closes[i - 3]:
-            return {"name": "Inverted Hammer", "bias": "bullish", "strength": 1, "index": i}
+            return _INVERTED_HAMMER
     return None
 
 
-def _detect_engulfing(opens, highs, lows, closes, i) -> Optional[Dict]:
+def _detect_engulfing(b: _Bars, i: int) -> Optional[Tuple[str, str, int]]:
     """Bullish or Bearish Engulfing (2-bar)."""
     if i < 1:
         return None
-    o0, c0 = opens[i - 1], closes[i - 1]
-    o1, c1 = opens[i], closes[i]
+    o0, c0 = b.opens[i - 1], b.closes[i - 1]
+    o1, c1 = b.opens[i], b.closes[i]
 
     # Bullish engulfing
-    if _is_bearish(o0, c0) and _is_bullish(o1, c1):
+    if b.bear[i - 1] and b.bull[i]:
         if o1 <= c0 and c1 >= o0:
-            return {"name": "Bullish Engulfing", "bias": "bullish", "strength": 3, "index": i}
+            return _BULLISH_ENGULFING
 
     # Bearish engulfing
-    if _is_bullish(o0, c0) and _is_bearish(o1, c1):
+    if b.bull[i - 1] and b.bear[i]:
         if o1 >= c0 and c1 <= o0:
-            return {"name": "Bearish Engulfing", "bias": "bearish", "strength": 3, "index": i}
+            return _BEARISH_ENGULFING
 
     return None
 
 
-def _detect_morning_evening_star(opens, highs, lows, closes, i) -> Optional[Dict]:
+def _detect_morning_evening_star(b: _Bars, i: int) -> Optional[Tuple[str, str, int]]:
     """Morning Star (bullish) / Evening Star (bearish) — 3-bar patterns."""
     if i < 2:
         return None
-    o0, c0 = opens[i - 2], closes[i - 2]
-    o1, c1 = opens[i - 1], closes[i - 1]
-    o2, c2 = opens[i], closes[i]
-
-    body0 = _body(o0, c0)
-    body1 = _body(o1, c1)
-    body2 = _body(o2, c2)
+    body0, body1, body2 = b.body[i - 2], b.body[i - 1], b.body[i]
 
     # Morning star: big bearish → small body → big bullish
-    if (_is_bearish(o0, c0) and body0 > body1 * 2
-            and _is_bullish(o2, c2) and body2 > body1 * 2):
-        return {"name": "Morning Star", "bias": "bullish", "strength": 3, "index": i}
+    if (b.bear[i - 2] and body0 > body1 * 2
+            and b.bull[i] and body2 > body1 * 2):
+        return _MORNING_STAR
 
     # Evening star: big bullish → small body → big bearish
-    if (_is_bullish(o0, c0) and body0 > body1 * 2
-            and _is_bearish(o2, c2) and body2 > body1 * 2):
-        return {"name": "Evening Star", "bias": "bearish", "strength": 3, "index": i}
+    if (b.bull[i - 2] and body0 > body1 * 2
+            and b.bear[i] and body2 > body1 * 2):
+        return _EVENING_STAR
 
     return None
 
 
-def _detect_three_soldiers_crows(opens, highs, lows, closes, i) -> Optional[Dict]:
+def _detect_three_soldiers_crows(b: _Bars, i: int) -> Optional[Tuple[str, str, int]]:
     """Three White Soldiers / Three Black Crows."""
     if i < 2:
         return None
+    closes = b.closes
     # Three white soldiers
-    if all(_is_bullish(opens[i - j], closes[i - j]) for j in range(3)):
+    if b.bull[i] and b.bull[i - 1] and b.bull[i - 2]:
         if closes[i] > closes[i - 1] > closes[i - 2]:
-            return {"name": "Three White Soldiers", "bias": "bullish", "strength": 3, "index": i}
+            return _THREE_WHITE_SOLDIERS
 
     # Three black crows
-    if all(_is_bearish(opens[i - j], closes[i - j]) for j in range(3)):
+    if b.bear[i] and b.bear[i - 1] and b.bear[i - 2]:
         if closes[i] < closes[i - 1] < closes[i - 2]:
-            return {"name": "Three Black Crows", "bias": "bearish", "strength": 3, "index": i}
+            return _THREE_BLACK_CROWS
 
     return None
 
 
-def _detect_tweezer(opens, highs, lows, closes, i) -> Optional[Dict]:
+def _detect_tweezer(b: _Bars, i: int) -> Optional[Tuple[str, str, int]]:
     """Tweezer Top / Bottom — two candles with near-identical highs or lows."""
     if i < 1:
         return None
-    tol = _range(highs[i], lows[i]) * 0.05 if _range(highs[i], lows[i]) else 0.001
+    tol = b.rng[i] * 0.05 if b.rng[i] else 0.001
 
     # Tweezer top
-    if abs(highs[i] - highs[i - 1]) <= tol and _is_bearish(opens[i], closes[i]) and _is_bullish(opens[i - 1], closes[i - 1]):
-        return {"name": "Tweezer Top", "bias": "bearish", "strength": 2, "index": i}
+    if abs(b.highs[i] - b.highs[i - 1]) <= tol and b.bear[i] and b.bull[i - 1]:
+        return _TWEEZER_TOP
 
     # Tweezer bottom
-    if abs(lows[i] - lows[i - 1]) <= tol and _is_bullish(opens[i], closes[i]) and _is_bearish(opens[i - 1], closes[i - 1]):
-        return {"name": "Tweezer Bottom", "bias": "bullish", "strength": 2, "index": i}
+    if abs(b.lows[i] - b.lows[i - 1]) <= tol and b.bull[i] and b.bear[i - 1]:
+        return _TWEEZER_BOTTOM
 
     return None
 
 
-def _detect_pin_bar(opens, highs, lows, closes, i) -> Optional[Dict]:
+def _detect_pin_bar(b: _Bars, i: int) -> Optional[Tuple[str, str, int]]:
     """Pin bar — one-sided wick at least 2/3 of total range."""
-    o, h, l, c = opens[i], highs[i], lows[i], closes[i]
-    r = _range(h, l)
+    r = b.rng[i]
     if r == 0:
         return None
-    ls = _lower_shadow(l, o, c)
-    us = _upper_shadow(h, o, c)
 
-    if ls / r >= 0.66:
-        return {"name": "Bullish Pin Bar", "bias": "bullish", "strength": 2, "index": i}
-    if us / r >= 0.66:
-        return {"name": "Bearish Pin Bar", "bias": "bearish", "strength": 2, "index": i}
+    if b.lower[i] / r >= 0.66:
+        return _BULLISH_PIN_BAR
+    if b.upper[i] / r >= 0.66:
+        return _BEARISH_PIN_BAR
     return None
 
 
+_DETECTORS = (
+    _detect_doji,
+    _detect_hammer,
+    _detect_shooting_star,
+    _detect_engulfing,
+    _detect_morning_evening_star,
+    _detect_three_soldiers_crows,
+    _detect_tweezer,
+    _detect_pin_bar,
+)
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # Scanner
 # ═══════════════════════════════════════════════════════════════════════════
@@ -190,35 +220,30 @@ def detect_patterns(ohlcv: Dict, lookback: int = 10) -> List[Dict]:
     Scan the last *lookback* bars and return all detected patterns,
     most recent first.
     """
-    opens = ohlcv["open"]
-    highs = ohlcv["high"]
-    lows = ohlcv["low"]
-    closes = ohlcv["close"]
-    n = len(closes)
+    n = len(ohlcv["close"])
     start = max(0, n - lookback)
 
-    patterns: List[Dict] = []
-    for i in range(start, n):
-        for detector in (
-            lambda idx: _detect_doji(opens[idx], highs[idx], lows[idx], closes[idx], idx),
-            lambda idx: _detect_hammer(opens, highs, lows, closes, idx),
-            lambda idx: _detect_shooting_star(opens, highs, lows, closes, idx),
-            lambda idx: _detect_engulfing(opens, highs, lows, closes, idx),
-            lambda idx: _detect_morning_evening_star(opens, highs, lows, closes, idx),
-            lambda idx: _detect_three_soldiers_crows(opens, highs, lows, closes, idx),
-            lambda idx: _detect_tweezer(opens, highs, lows, closes, idx),
-            lambda idx: _detect_pin_bar(opens, highs, lows, closes, idx),
-        ):
-            result = detector(i)
-            if result:
-                result["bars_ago"] = n - 1 - i
-                patterns.append(result)
-
-    # Deduplicate — keep highest-strength per bar
-    seen = {}
-    for p in patterns:
-        key = (p["index"], p["bias"])
-        if key not in seen or p["strength"] > seen[key]["strength"]:
-            seen[key] = p
-    deduped = sorted(seen.values(), key=lambda x: x["index"], reverse=True)
+    # Only the scanned bars plus the detectors' look-behind are needed; work
+    # in window-local indexes and shift back when reporting.
+    base = max(0, start - _MAX_LOOKBEHIND)
+    b = _bars(ohlcv["open"][base:], ohlcv["high"][base:],
+              ohlcv["low"][base:], ohlcv["close"][base:])
+
+    # One pattern per (bar, bias): the strongest, first found on ties
+    seen: Dict[Tuple[int, str], Tuple[str, str, int]] = {}
+    for i in range(start - base, n - base):
+        for detector in _DETECTORS:
+            pat = detector(b, i)
+            if pat:
+                key = (i + base, pat[1])
+                prev = seen.get(key)
+                if prev is None or pat[2] > prev[2]:
+                    seen[key] = pat
+
+    deduped = [
+        {"name": name, "bias": bias, "strength": strength, "index": index,
+         "bars_ago": n - 1 - index}
+        for (index, _), (name, bias, strength) in sorted(
+            seen.items(), key=lambda kv: kv[0][0], reverse=True)
+    ]
     return deduped
@@ -2,13 +2,16 @@
 Entry point — runs Telegram bot + Flask admin dashboard together.
 
 • Telegram bot runs on the main asyncio loop
-• Flask dashboard runs in a background thread
+• Flask dashboard runs in a separate process (its own GIL)
 • Accuracy checker runs as an asyncio background task
 """
 import os
 import sys
 import logging
+import multiprocessing
+import signal
 import threading
+import time
 
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
@@ -17,23 +20,86 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Set on shutdown, so the watcher stops instead of restarting the dashboard
+_SHUTDOWN = threading.Event()
+_PROCESS_LOCK = threading.Lock()
+_dashboard_process = None
+_RESTART_DELAY = 5  # seconds; doubles per crash, up to _RESTART_DELAY_MAX
+_RESTART_DELAY_MAX = 300
+
+
 def start_dashboard():
-    """Launch Flask dashboard in a daemon thread."""
-    from dashboard import run_dashboard
+    """
+    Launch the dashboard in a daemon process, so serving it never holds the
+    GIL the bot's analysis needs.  It only talks to Supabase, so nothing is
+    shared with the bot.  A watcher thread restarts it if it dies.
+    """
     port = int(os.environ.get("DASHBOARD_PORT", os.environ.get("PORT", 8000)))
-    thread = threading.Thread(target=run_dashboard, args=(port,), daemon=True)
-    thread.start()
-    logger.info("Dashboard thread started on port %d", port)
+    threading.Thread(target=_watch_dashboard, args=(port,), daemon=True,
+                     name="dashboard-watch").start()
+
+
+def stop_dashboard():
+    """Stop the watcher, then the dashboard process."""
+    with _PROCESS_LOCK:
+        _SHUTDOWN.set()
+        process = _dashboard_process
+    if process is not None and process.is_alive():
+        process.terminate()
+        process.join(5)
+
+
+def _serve_dashboard(port: int):
+    # Ctrl-C reaches the whole process group; leave stopping the dashboard
+    # to stop_dashboard() so it is not mistaken for a crash
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from dashboard import run_dashboard
+    run_dashboard(port)
+
+
+def _watch_dashboard(port: int):
+    """
+    Run the dashboard process and restart it after it exits, backing off
+    while it keeps crashing.  Stops once stop_dashboard() has been called.
+    """
+    global _dashboard_process
+    # spawn: a fresh interpreter rather than a fork of this one
+    ctx = multiprocessing.get_context("spawn")
+    delay = _RESTART_DELAY
+    while True:
+        with _PROCESS_LOCK:
+            if _SHUTDOWN.is_set():
+                return
+            process = ctx.Process(target=_serve_dashboard, args=(port,), daemon=True,
+                                  name="dashboard")
+            process.start()
+            _dashboard_process = process
+        logger.info("Dashboard process %d started on port %d", process.pid, port)
+        started = time.monotonic()
+        process.join()
+        if _SHUTDOWN.is_set():
+            return
+        if time.monotonic() - started > _RESTART_DELAY_MAX:
+            delay = _RESTART_DELAY  # it had been running fine
+        logger.error("Dashboard process exited with code %s — restarting in %ds",
+                     process.exitcode, delay)
+        if _SHUTDOWN.wait(delay):
+            return
+        delay = min(delay * 2, _RESTART_DELAY_MAX)
 
 
 def main():
-    # Start dashboard first (non-blocking thread)
+    # Start dashboard first (its own process, started and watched from a
+    # background thread)
     start_dashboard()
 
     # Start bot (blocks — runs asyncio event loop)
     # skip_health_server=True because Flask already handles the web port
     from telegram_bot import main as bot_main
-    bot_main(skip_health_server=True)
+    try:
+        bot_main(skip_health_server=True)
+    finally:
+        stop_dashboard()
 
 
 if __name__ == "__main__":
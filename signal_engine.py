@@ -5,6 +5,7 @@ Aggregates all indicators, patterns, multi-TF trend, money flow, and levels
 into a single composite score from -100 (max bearish) to +100 (max bullish),
 plus a human-readable verdict and confidence level.
 """
+from bisect import bisect_left, bisect_right
 from typing import Dict, List
 import config
 
@@ -13,22 +14,46 @@ def _clamp(val: float, lo: float = -100, hi: float = 100) -> float:
     return max(lo, min(hi, val))
 
 
+_TREND_SCORES = {
+    "bullish": 25,
+    "lean_bullish": 12,
+    "neutral": 0,
+    "lean_bearish": -12,
+    "bearish": -25,
+}
+_FLOW_SCORES = {
+    "strong_inflow": 18,
+    "inflow": 10,
+    "balanced": 0,
+    "outflow": -10,
+    "strong_outflow": -18,
+}
+_BIAS_SIGN = {"bullish": 1, "bearish": -1}
+
+# Verdict bands: score <= -60, -30, -10 on the bearish side, >= 10, 30, 60
+# on the bullish side, Neutral in between
+_VERDICT_THRESHOLDS = (-60, -30, -10, 10, 30, 60)
+_VERDICTS = (
+    ("Strong Sell", "🔴🔴🔴"),
+    ("Sell", "🔴🔴"),
+    ("Lean Bearish", "🔴"),
+    ("Neutral", "🟡"),
+    ("Lean Bullish", "🟢"),
+    ("Buy", "🟢🟢"),
+    ("Strong Buy", "🟢🟢🟢"),
+)
+
+
 def score_trend(trend: Dict) -> float:
     """Score from multi-TF trend analysis (-25 … +25)."""
-    mapping = {
-        "bullish": 25,
-        "lean_bullish": 12,
-        "neutral": 0,
-        "lean_bearish": -12,
-        "bearish": -25,
-    }
-    base = mapping.get(trend["overall"], 0)
+    base = _TREND_SCORES.get(trend["overall"], 0)
 
-    # Bonus if all TFs agree
-    dirs = [trend["primary"]["direction"], trend["tf_1h"]["direction"], trend["tf_4h"]["direction"]]
-    if all("up" in d for d in dirs):
+    # Bonus if all TFs agree — direction codes 0-1 are down, 3-4 up
+    codes = (trend["primary"]["direction_code"], trend["tf_1h"]["direction_code"],
+             trend["tf_4h"]["direction_code"])
+    if min(codes) >= 3:
         base = min(base + 5, 25)
-    elif all("down" in d for d in dirs):
+    elif max(codes) <= 1:
         base = max(base - 5, -25)
 
     return base
@@ -73,14 +98,7 @@ def score_momentum(indicators: Dict) -> float:
 def score_volume(flow: Dict) -> float:
     """Score from volume / money flow (-20 … +20)."""
     s = 0.0
-    mapping = {
-        "strong_inflow": 18,
-        "inflow": 10,
-        "balanced": 0,
-        "outflow": -10,
-        "strong_outflow": -18,
-    }
-    s += mapping.get(flow["flow"], 0)
+    s += _FLOW_SCORES.get(flow["flow"], 0)
 
     if flow["vol_spike"]:
         # Spike amplifies current direction
@@ -125,16 +143,11 @@ def score_levels(indicators: Dict, levels: Dict) -> float:
 
 def score_patterns(patterns: List[Dict]) -> float:
     """Score from detected candlestick patterns (-15 … +15)."""
-    s = 0.0
-    for p in patterns:
-        weight = p["strength"]
-        # Recent patterns matter more
-        recency = max(1, 5 - p.get("bars_ago", 0))
-        contribution = weight * recency * 0.8
-        if p["bias"] == "bullish":
-            s += contribution
-        elif p["bias"] == "bearish":
-            s -= contribution
+    # Recent patterns matter more; neutral ones do not count
+    s = sum((
+        _BIAS_SIGN[p["bias"]] * (p["strength"] * max(1, 5 - p.get("bars_ago", 0)) * 0.8)
+        for p in patterns if p["bias"] in _BIAS_SIGN
+    ), 0.0)
     return _clamp(s, -15, 15)
 
 
@@ -165,28 +178,13 @@ def compute_signal(indicators: Dict, levels: Dict, trend: Dict,
     agreement = max(positive, negative)
     confidence = min(100, agreement * 20 + abs(score) // 2)
 
-    # Verdict
-    if score >= 60:
-        verdict = "Strong Buy"
-        emoji = "🟢🟢🟢"
-    elif score >= 30:
-        verdict = "Buy"
-        emoji = "🟢🟢"
-    elif score >= 10:
-        verdict = "Lean Bullish"
-        emoji = "🟢"
-    elif score <= -60:
-        verdict = "Strong Sell"
-        emoji = "🔴🔴🔴"
-    elif score <= -30:
-        verdict = "Sell"
-        emoji = "🔴🔴"
-    elif score <= -10:
-        verdict = "Lean Bearish"
-        emoji = "🔴"
+    # Verdict — bearish bands include their threshold from below, bullish
+    # ones from above
+    if score >= 0:
+        idx = bisect_right(_VERDICT_THRESHOLDS, score)
     else:
-        verdict = "Neutral"
-        emoji = "🟡"
+        idx = bisect_left(_VERDICT_THRESHOLDS, score)
+    verdict, emoji = _VERDICTS[idx]
 
     return {
         "score": round(score, 1),
@@ -0,0 +1,252 @@
+-- ═══════════════════════════════════════════════════════════════════════════
+-- Supabase RPC functions used by analytics.py
+--
+-- Run once in the Supabase SQL editor.  Every function is optional:
+-- analytics.py falls back to fetching rows and aggregating in Python when
+-- an RPC is not installed.
+-- ═══════════════════════════════════════════════════════════════════════════
+
+
+-- ── Dashboard aggregations ─────────────────────────────────────────────────
+
+CREATE OR REPLACE FUNCTION popular_coins(lim int DEFAULT 15)
+RETURNS TABLE(symbol text, count bigint, avg_score numeric, avg_conf numeric)
+LANGUAGE sql STABLE AS $$
+    SELECT a.symbol::text,
+           count(*),
+           round(avg(coalesce(a.score, 0))::numeric, 1),
+           round(avg(coalesce(a.confidence, 0))::numeric, 0)
+    FROM analyses a
+    GROUP BY a.symbol
+    ORDER BY count(*) DESC
+    LIMIT lim;
+$$;
+
+
+CREATE OR REPLACE FUNCTION popular_timeframes()
+RETURNS TABLE(timeframe text, count bigint)
+LANGUAGE sql STABLE AS $$
+    SELECT coalesce(a.timeframe, '?')::text, count(*)
+    FROM analyses a
+    GROUP BY 1
+    ORDER BY 2 DESC;
+$$;
+
+
+CREATE OR REPLACE FUNCTION signal_distribution()
+RETURNS TABLE(verdict text, count bigint)
+LANGUAGE sql STABLE AS $$
+    SELECT coalesce(nullif(a.verdict, ''), 'Unknown')::text, count(*)
+    FROM analyses a
+    GROUP BY 1
+    ORDER BY 2 DESC;
+$$;
+
+
+CREATE OR REPLACE FUNCTION usage_over_time(days int DEFAULT 30)
+RETURNS TABLE(day text, count bigint)
+LANGUAGE sql STABLE AS $$
+    SELECT to_char(a.created_at AT TIME ZONE 'UTC', 'YYYY-MM-DD'), count(*)
+    FROM analyses a
+    WHERE a.created_at >= now() - make_interval(days => days)
+    GROUP BY 1
+    ORDER BY 1;
+$$;
+
+
+CREATE OR REPLACE FUNCTION hourly_usage(days int DEFAULT 7)
+RETURNS TABLE(hour int, count bigint)
+LANGUAGE sql STABLE AS $$
+    SELECT extract(hour FROM a.created_at AT TIME ZONE 'UTC')::int, count(*)
+    FROM analyses a
+    WHERE a.created_at >= now() - make_interval(days => days)
+    GROUP BY 1
+    ORDER BY 1;
+$$;
+
+
+CREATE OR REPLACE FUNCTION top_users_with_favs(lim int DEFAULT 50)
+RETURNS TABLE(telegram_id bigint, username text, first_name text, last_name text,
+              first_seen timestamptz, last_seen timestamptz, total_analyses int,
+              fav_symbol text, fav_timeframe text)
+LANGUAGE sql STABLE AS $$
+    WITH top AS (
+        SELECT u.telegram_id, u.username, u.first_name, u.last_name,
+               u.first_seen, u.last_seen, u.total_analyses
+        FROM bot_users u
+        ORDER BY u.total_analyses DESC NULLS LAST
+        LIMIT lim
+    ),
+    fav_s AS (
+        SELECT DISTINCT ON (a.telegram_id) a.telegram_id, a.symbol
+        FROM analyses a JOIN top t ON t.telegram_id = a.telegram_id
+        GROUP BY a.telegram_id, a.symbol
+        ORDER BY a.telegram_id, count(*) DESC
+    ),
+    fav_t AS (
+        SELECT DISTINCT ON (a.telegram_id) a.telegram_id, a.timeframe
+        FROM analyses a JOIN top t ON t.telegram_id = a.telegram_id
+        GROUP BY a.telegram_id, a.timeframe
+        ORDER BY a.telegram_id, count(*) DESC
+    )
+    SELECT t.telegram_id::bigint, t.username::text, t.first_name::text, t.last_name::text,
+           t.first_seen::timestamptz, t.last_seen::timestamptz, t.total_analyses::int,
+           s.symbol::text, f.timeframe::text
+    FROM top t
+    LEFT JOIN fav_s s ON s.telegram_id = t.telegram_id
+    LEFT JOIN fav_t f ON f.telegram_id = t.telegram_id
+    ORDER BY t.total_analyses DESC NULLS LAST;
+$$;
+
+-- ── Signal accuracy (4h window) ────────────────────────────────────────────
+
+CREATE OR REPLACE FUNCTION accuracy_by_verdict_4h()
+RETURNS TABLE(verdict text, total bigint, correct bigint,
+              accuracy_pct numeric, avg_change numeric)
+LANGUAGE sql STABLE AS $$
+    SELECT coalesce(s.verdict, 'Unknown')::text,
+           count(*) FILTER (WHERE s.checked_4h),
+           count(*) FILTER (WHERE s.checked_4h AND s.correct_4h),
+           coalesce(round(100.0 * count(*) FILTER (WHERE s.checked_4h AND s.correct_4h)
+                          / nullif(count(*) FILTER (WHERE s.checked_4h), 0), 1), 0),
+           coalesce(round(avg(s.return_4h) FILTER (WHERE s.checked_4h)::numeric, 3), 0)
+    FROM signal_accuracy s
+    GROUP BY 1
+    ORDER BY 2 DESC;
+$$;
+
+
+CREATE OR REPLACE FUNCTION accuracy_by_coin_4h(min_total int DEFAULT 2)
+RETURNS TABLE(symbol text, total bigint, correct bigint,
+              accuracy_pct numeric, avg_change numeric)
+LANGUAGE sql STABLE AS $$
+    SELECT s.symbol::text,
+           count(*),
+           count(*) FILTER (WHERE s.correct_4h),
+           round(100.0 * count(*) FILTER (WHERE s.correct_4h) / count(*), 1),
+           coalesce(round(avg(s.return_4h)::numeric, 3), 0)
+    FROM signal_accuracy s
+    WHERE s.checked_4h
+    GROUP BY s.symbol
+    HAVING count(*) >= min_total
+    ORDER BY 4 DESC;
+$$;
+
+
+CREATE OR REPLACE FUNCTION accuracy_by_confidence_4h()
+RETURNS TABLE(confidence_bucket text, total bigint, correct bigint,
+              accuracy_pct numeric, avg_change numeric)
+LANGUAGE sql STABLE AS $$
+    WITH b(ord, label, lo, hi) AS (
+        VALUES (1, 'High (70-100%)', 70, NULL),
+               (2, 'Medium (40-69%)', 40, 70),
+               (3, 'Low (0-39%)', NULL, 40)
+    )
+    SELECT b.label,
+           count(s.id),
+           count(s.id) FILTER (WHERE s.correct_4h),
+           coalesce(round(100.0 * count(s.id) FILTER (WHERE s.correct_4h)
+                          / nullif(count(s.id), 0), 1), 0),
+           coalesce(round(avg(s.return_4h)::numeric, 3), 0)
+    FROM b
+    LEFT JOIN signal_accuracy s
+           ON s.checked_4h
+          AND (b.lo IS NULL OR coalesce(s.confidence, 0) >= b.lo)
+          AND (b.hi IS NULL OR coalesce(s.confidence, 0) < b.hi)
+    GROUP BY b.ord, b.label
+    ORDER BY b.ord;
+$$;
+
+
+-- ── Accuracy checker writes ────────────────────────────────────────────────
+
+-- payload: [{"id": 1, "price_1h": ..., "return_1h": ..., "correct_1h": ...,
+--            "checked_1h": true, "target_hit": ..., "stop_hit": ...}, ...]
+-- Keys that are absent leave the column unchanged.  Returns rows updated.
+CREATE OR REPLACE FUNCTION bulk_update_accuracy(payload jsonb)
+RETURNS integer
+LANGUAGE sql AS $$
+    WITH u AS (
+        UPDATE signal_accuracy s SET
+            price_1h    = coalesce(p.price_1h,    s.price_1h),
+            return_1h   = coalesce(p.return_1h,   s.return_1h),
+            correct_1h  = coalesce(p.correct_1h,  s.correct_1h),
+            checked_1h  = coalesce(p.checked_1h,  s.checked_1h),
+            price_4h    = coalesce(p.price_4h,    s.price_4h),
+            return_4h   = coalesce(p.return_4h,   s.return_4h),
+            correct_4h  = coalesce(p.correct_4h,  s.correct_4h),
+            checked_4h  = coalesce(p.checked_4h,  s.checked_4h),
+            price_24h   = coalesce(p.price_24h,   s.price_24h),
+            return_24h  = coalesce(p.return_24h,  s.return_24h),
+            correct_24h = coalesce(p.correct_24h, s.correct_24h),
+            checked_24h = coalesce(p.checked_24h, s.checked_24h),
+            target_hit  = coalesce(p.target_hit,  s.target_hit),
+            stop_hit    = coalesce(p.stop_hit,    s.stop_hit)
+        FROM jsonb_to_recordset(payload) AS p(
+            id bigint,
+            price_1h float8, return_1h float8, correct_1h boolean, checked_1h boolean,
+            price_4h float8, return_4h float8, correct_4h boolean, checked_4h boolean,
+            price_24h float8, return_24h float8, correct_24h boolean, checked_24h boolean,
+            target_hit boolean, stop_hit boolean
+        )
+        WHERE s.id = p.id
+        RETURNING 1
+    )
+    SELECT count(*)::int FROM u;
+$$;
+
+
+-- ── Analysis logging ───────────────────────────────────────────────────────
+
+-- Upserts the user, inserts the analysis and (when given) its accuracy
+-- tracking row in one transaction; returns the new analyses.id.
+-- The user row is updated, or inserted when there is none, so no unique
+-- constraint on bot_users.telegram_id is needed.
+CREATE OR REPLACE FUNCTION log_analysis_v1(p_telegram_id bigint, p_username text,
+                                           p_first_name text, p_analysis jsonb,
+                                           p_accuracy jsonb DEFAULT NULL)
+RETURNS bigint
+LANGUAGE plpgsql AS $$
+DECLARE
+    new_id bigint;
+BEGIN
+    IF p_telegram_id IS NOT NULL THEN
+        UPDATE bot_users AS u
+           SET username = p_username,
+               first_name = p_first_name,
+               last_seen = now(),
+               total_analyses = coalesce(u.total_analyses, 0) + 1
+         WHERE u.telegram_id = p_telegram_id;
+        IF NOT FOUND THEN
+            INSERT INTO bot_users (telegram_id, username, first_name,
+                                   first_seen, last_seen, total_analyses)
+            VALUES (p_telegram_id, p_username, p_first_name, now(), now(), 1);
+        END IF;
+    END IF;
+
+    INSERT INTO analyses (telegram_id, symbol, timeframe, market, source,
+                          score, verdict, confidence, price_at_signal,
+                          trend_score, momentum_score, volume_score,
+                          levels_score, patterns_score, rsi, macd_hist, adx,
+                          bb_pct_b, vol_ratio, trend_overall, flow_direction)
+    SELECT telegram_id, symbol, timeframe, market, source,
+           score, verdict, confidence, price_at_signal,
+           trend_score, momentum_score, volume_score,
+           levels_score, patterns_score, rsi, macd_hist, adx,
+           bb_pct_b, vol_ratio, trend_overall, flow_direction
+    FROM jsonb_populate_record(NULL::analyses, p_analysis)
+    RETURNING id INTO new_id;
+
+    IF p_accuracy IS NOT NULL AND p_accuracy <> 'null'::jsonb THEN
+        INSERT INTO signal_accuracy (analysis_id, symbol, verdict, score,
+                                     confidence, price_at_signal, bull_target,
+                                     bear_target, bull_stop, bear_stop)
+        SELECT new_id, symbol, verdict, score,
+               confidence, price_at_signal, bull_target,
+               bear_target, bull_stop, bear_stop
+        FROM jsonb_populate_record(NULL::signal_accuracy, p_accuracy);
+    END IF;
+
+    RETURN new_id;
+END;
+$$;
@@ -13,14 +13,19 @@ import asyncio
 import logging
 import os
 import time
-import threading
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from functools import lru_cache
+from typing import Optional
+from aiohttp import web
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest, TelegramError
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, filters, ContextTypes
-from multi_exchange_client import MultiExchangeClient
+from telegram.request import HTTPXRequest
+from crypto_analyzer import get_client
+from cache_manager import CacheManager
 from main import analyze_coin, analyze_coin_raw
 from formatter import format_analysis as _fmt
 import analytics
+import config
 
 
 def _format_raw(raw_data: dict) -> str:
@@ -54,15 +59,19 @@ DEFI_SYMBOLS = [
     "MKR/USDT", "SNX/USDT", "CRV/USDT", "1INCH/USDT",
 ]
 TIMEFRAMES = ["5m", "15m", "30m", "1h", "4h", "1d"]
+_MARKET_SYMBOLS = {"crypto": CRYPTO_SYMBOLS, "forex": FOREX_SYMBOLS, "defi": DEFI_SYMBOLS}
+_MARKET_TITLES = {"crypto": "💰 Select Crypto:", "forex": "💱 Select Pair:", "defi": "🏦 Select DeFi:"}
 
-# Temporary user selections
-user_data: dict = {}
+# Temporary user selections (picker state) — abandoned flows expire
+user_data = CacheManager(ttl_seconds=config.USER_SESSION_TTL_SECONDS,
+                         maxsize=config.USER_SESSION_MAX)
 
 
 # ═══════════════════════════════════════════════════════════════════════════
 # Display helpers
 # ═══════════════════════════════════════════════════════════════════════════
 
+@lru_cache(maxsize=256)
 def _display_name(symbol: str, market: str) -> str:
     if market == "crypto":
         return symbol.replace("/USDT", "")
@@ -75,14 +84,94 @@ def _display_name(symbol: str, market: str) -> str:
     return symbol.replace("/USDT", "")
 
 
-def _market_keyboard() -> InlineKeyboardMarkup:
+@lru_cache(maxsize=1024)
+def _normalize_symbol(text: str) -> Optional[str]:
+    """
+    Typed coin → exchange symbol ("$pepe" → "PEPE/USDT", "ethusdt" →
+    "ETH/USDT"; anything with a "/" is kept as a pair).  None if empty or
+    too long to be a symbol.
+    """
+    raw = text.upper().replace("$", "").replace(" ", "").strip()
+    if not raw or len(raw) > 20:
+        return None
+    if "/" in raw:
+        return raw
+    if raw.endswith("USDT"):
+        return raw[:-4] + "/USDT"
+    return f"{raw}/USDT"
+
+
+# ── Keyboards ─────────────────────────────────────────────────────────────
+# Markups are immutable, so the fixed ones are built once at import and
+# shared; only markets outside _MARKET_SYMBOLS are built per request.
+
+# Symbol / timeframe buttons carry short codes ("s0f", "t3") instead of
+# "sym_XAU/USDT:USDT"; button_callback maps them back to the long form,
+# which older messages still send.
+_SYMBOL_CODES = {
+    sym: f"s{i:02x}"
+    for i, sym in enumerate(dict.fromkeys(s for syms in _MARKET_SYMBOLS.values() for s in syms))
+}
+_TF_CODES = {tf: f"t{i}" for i, tf in enumerate(TIMEFRAMES)}
+_CALLBACK_DECODE = {
+    **{code: f"sym_{sym}" for sym, code in _SYMBOL_CODES.items()},
+    **{code: f"tf_{tf}" for tf, code in _TF_CODES.items()},
+}
+
+_MARKET_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("💰 Crypto", callback_data="market_crypto")],
+    [InlineKeyboardButton("💱 Forex / Commodities", callback_data="market_forex")],
+    [InlineKeyboardButton("🏦 DeFi", callback_data="market_defi")],
+])
+
+
+def _build_symbol_keyboard(market: str) -> InlineKeyboardMarkup:
+    symbols = _MARKET_SYMBOLS.get(market, CRYPTO_SYMBOLS)
+    keyboard = [
+        [InlineKeyboardButton(_display_name(sym, market), callback_data=_SYMBOL_CODES[sym])
+         for sym in symbols[i:i + 2]]
+        for i in range(0, len(symbols), 2)
+    ]
+    keyboard.append([
+        InlineKeyboardButton("🔍 Custom", callback_data=f"custom_{market}"),
+        InlineKeyboardButton("⬅️ Back", callback_data="new_analysis"),
+    ])
+    return InlineKeyboardMarkup(keyboard)
+
+
+def _build_tf_keyboard(market: str) -> InlineKeyboardMarkup:
+    keyboard = [
+        [InlineKeyboardButton(tf, callback_data=_TF_CODES[tf]) for tf in TIMEFRAMES[i:i + 3]]
+        for i in range(0, len(TIMEFRAMES), 3)
+    ]
+    keyboard.append([InlineKeyboardButton("⬅️ Back", callback_data=f"market_{market}")])
+    return InlineKeyboardMarkup(keyboard)
+
+
+def _build_nav_keyboard(market: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup([
-        [InlineKeyboardButton("💰 Crypto", callback_data="market_crypto")],
-        [InlineKeyboardButton("� Forex / Commodities", callback_data="market_forex")],
-        [InlineKeyboardButton("🏦 DeFi", callback_data="market_defi")],
+        [InlineKeyboardButton("🔄 New Analysis", callback_data="new_analysis")],
+        [InlineKeyboardButton(f"💰 More {market.title()}", callback_data=f"market_{market}")],
     ])
 
 
+_SYMBOL_KEYBOARDS = {m: _build_symbol_keyboard(m) for m in _MARKET_SYMBOLS}
+_TF_KEYBOARDS = {m: _build_tf_keyboard(m) for m in _MARKET_SYMBOLS}
+_NAV_KEYBOARDS = {m: _build_nav_keyboard(m) for m in _MARKET_SYMBOLS}
+
+
+def _symbol_keyboard(market: str) -> InlineKeyboardMarkup:
+    return _SYMBOL_KEYBOARDS.get(market) or _build_symbol_keyboard(market)
+
+
+def _tf_keyboard(market: str) -> InlineKeyboardMarkup:
+    return _TF_KEYBOARDS.get(market) or _build_tf_keyboard(market)
+
+
+def _nav_keyboard(market: str) -> InlineKeyboardMarkup:
+    return _NAV_KEYBOARDS.get(market) or _build_nav_keyboard(market)
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # Command handlers
 # ═══════════════════════════════════════════════════════════════════════════
@@ -106,7 +195,7 @@ async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "• Composite signal score with confidence %\n"
         "• Data-driven IF/THEN scenarios with R:R\n\n"
         "Pick a market to start 👇",
-        reply_markup=_market_keyboard(),
+        reply_markup=_MARKET_KEYBOARD,
         parse_mode="HTML",
     )
 
@@ -129,7 +218,7 @@ async def cmd_analyze(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if context.args:
         await _run_analysis_direct(update, context)
     else:
-        await update.message.reply_text("Select a market:", reply_markup=_market_keyboard())
+        await update.message.reply_text("Select a market:", reply_markup=_MARKET_KEYBOARD)
 
 
 async def cmd_quick(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -137,12 +226,19 @@ async def cmd_quick(update: Update, context: ContextTypes.DEFAULT_TYPE):
     coins = ["BTC/USDT", "ETH/USDT", "SOL/USDT", "XRP/USDT"]
     user = update.effective_user
     await update.message.reply_text("⏳ <b>Quick scan starting…</b>", parse_mode="HTML")
-    for coin in coins:
+
+    async def _analyze(coin: str):
         t0 = time.time()
+        raw_data = await _analyze_raw(coin, "15m")
+        return raw_data, _format_raw(raw_data), int((time.time() - t0) * 1000)
+
+    # All coins are analyzed concurrently; replies still go out in order
+    results = await asyncio.gather(*(_analyze(c) for c in coins), return_exceptions=True)
+    for coin, res in zip(coins, results):
         try:
-            raw_data = await analyze_coin_raw(coin, "15m")
-            result = _format_raw(raw_data)
-            elapsed = int((time.time() - t0) * 1000)
+            if isinstance(res, Exception):
+                raise res
+            raw_data, result, elapsed = res
             await analytics.async_log_analysis(
                 user_id=user.id, username=user.username, first_name=user.first_name,
                 symbol=coin, timeframe="15m", source="telegram_quick",
@@ -151,13 +247,15 @@ async def cmd_quick(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 flow=raw_data.get("flow"), scenarios=raw_data.get("scenarios"),
                 response_time_ms=elapsed,
             )
-            await _send_analysis(update.message, result, coin, "crypto")
+            rest = await _send_analysis(update.message, result, coin, "crypto")
+            if rest is not None:
+                await rest  # the next coin's reply must not overtake it
         except Exception as e:
             await analytics.async_log_error(
-                error_type="quick_scan_error", details=str(e),
+                error_type="quick_scan_error", details=str(e) or type(e).__name__,
                 telegram_id=user.id, symbol=coin, timeframe="15m",
             )
-            await update.message.reply_text(f"❌ {coin}: {e}")
+            await update.message.reply_text(f"<b>{coin}</b> · {_error_text(e)}", parse_mode="HTML")
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -165,13 +263,10 @@ async def cmd_quick(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # ═══════════════════════════════════════════════════════════════════════════
 
 async def _run_analysis_direct(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    raw = context.args[0].upper()
-    if "/" not in raw and not raw.endswith("USDT"):
-        symbol = f"{raw}/USDT"
-    elif "/" not in raw:
-        symbol = raw[:-4] + "/USDT"
-    else:
-        symbol = raw
+    symbol = _normalize_symbol(context.args[0])
+    if symbol is None:
+        await update.message.reply_text("❌ Invalid symbol. Example: <code>/analyze BTC 15m</code>", parse_mode="HTML")
+        return
 
     timeframe = context.args[1] if len(context.args) > 1 else "15m"
     user = update.effective_user
@@ -183,7 +278,7 @@ async def _run_analysis_direct(update: Update, context: ContextTypes.DEFAULT_TYP
 
     t0 = time.time()
     try:
-        raw_data = await analyze_coin_raw(symbol, timeframe)
+        raw_data = await _analyze_raw(symbol, timeframe)
         result = _format_raw(raw_data)
         elapsed = int((time.time() - t0) * 1000)
 
@@ -201,64 +296,81 @@ async def _run_analysis_direct(update: Update, context: ContextTypes.DEFAULT_TYP
     except Exception as e:
         logger.exception("Analysis error for %s", symbol)
         await analytics.async_log_error(
-            error_type="analysis_error", details=str(e),
+            error_type="analysis_error", details=str(e) or type(e).__name__,
             telegram_id=user.id, symbol=symbol, timeframe=timeframe,
         )
         kb = InlineKeyboardMarkup([[
             InlineKeyboardButton("🔄 Try Again", callback_data="new_analysis"),
         ]])
-        await update.message.reply_text(f"❌ <b>Error:</b> {_escape_html(str(e))}", parse_mode="HTML", reply_markup=kb)
+        await update.message.reply_text(_error_text(e), parse_mode="HTML", reply_markup=kb)
 
 
 # ═══════════════════════════════════════════════════════════════════════════
 # Send analysis result (handles chunking + buttons)
 # ═══════════════════════════════════════════════════════════════════════════
 
+# Background sends of the later chunks; referenced so they are not
+# garbage-collected mid-flight
+_SEND_TASKS = set()
+
+
 async def _send_analysis(target, text: str, symbol: str, market: str):
     """Send analysis replying to a message (used by /analyze, /quick)."""
-    keyboard = InlineKeyboardMarkup([
-        [InlineKeyboardButton("🔄 New Analysis", callback_data="new_analysis")],
-        [InlineKeyboardButton(f"💰 More {market.title()}", callback_data=f"market_{market}")],
-    ])
-
-    if len(text) <= 4096:
-        await target.reply_text(text, parse_mode="HTML", reply_markup=keyboard)
-    else:
-        chunks = _smart_chunk(text, 4096)
-        for i, chunk in enumerate(chunks):
-            rm = keyboard if i == len(chunks) - 1 else None
-            await target.reply_text(chunk, parse_mode="HTML", reply_markup=rm)
+    return await _send_chunks(target.reply_text, text, _nav_keyboard(market))
 
 
 async def _send_analysis_to_chat(chat, text: str, symbol: str, market: str):
     """Send analysis directly to chat (no reply, used by button flow)."""
-    keyboard = InlineKeyboardMarkup([
-        [InlineKeyboardButton("🔄 New Analysis", callback_data="new_analysis")],
-        [InlineKeyboardButton(f"💰 More {market.title()}", callback_data=f"market_{market}")],
-    ])
+    return await _send_chunks(chat.send_message, text, _nav_keyboard(market))
 
+
+async def _send_chunks(send, text: str, keyboard):
+    """
+    Send text in order with the keyboard on the last message.  Only the
+    first chunk is awaited — the user sees it straight away — and the rest
+    go out from a background task, returned so callers that send more
+    afterwards can wait for it.
+    """
     if len(text) <= 4096:
-        await chat.send_message(text, parse_mode="HTML", reply_markup=keyboard)
-    else:
-        chunks = _smart_chunk(text, 4096)
+        await send(text, parse_mode="HTML", reply_markup=keyboard)
+        return None
+    chunks = _smart_chunk(text, 4096)
+    await send(chunks[0], parse_mode="HTML")
+    task = asyncio.create_task(_send_rest(send, chunks[1:], keyboard))
+    _SEND_TASKS.add(task)
+    task.add_done_callback(_SEND_TASKS.discard)
+    return task
+
+
+async def _send_rest(send, chunks: list, keyboard):
+    last = len(chunks) - 1
+    try:
         for i, chunk in enumerate(chunks):
-            rm = keyboard if i == len(chunks) - 1 else None
-            await chat.send_message(chunk, parse_mode="HTML", reply_markup=rm)
+            await send(chunk, parse_mode="HTML", reply_markup=keyboard if i == last else None)
+    except Exception:
+        logger.exception("Failed to send analysis chunk")
 
 
 def _smart_chunk(text: str, limit: int) -> list:
-    """Split text at paragraph boundaries."""
+    """
+    Split text at paragraph boundaries.  Walks an offset through the text
+    rather than re-slicing the remaining tail on every chunk.
+    """
     parts = []
-    while len(text) > limit:
-        cut = text.rfind("\n\n", 0, limit)
+    start, n = 0, len(text)
+    while n - start > limit:
+        end = start + limit
+        cut = text.rfind("\n\n", start, end)
         if cut == -1:
-            cut = text.rfind("\n", 0, limit)
+            cut = text.rfind("\n", start, end)
         if cut == -1:
-            cut = limit
-        parts.append(text[:cut])
-        text = text[cut:].lstrip("\n")
-    if text:
-        parts.append(text)
+            cut = end
+        parts.append(text[start:cut])
+        start = cut
+        while start < n and text[start] == "\n":
+            start += 1
+    if start < n:
+        parts.append(text[start:])
     return parts
 
 
@@ -266,16 +378,45 @@ def _escape_html(text: str) -> str:
     return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
 
 
+def _error_text(e: Exception) -> str:
+    if isinstance(e, asyncio.TimeoutError):
+        return "⏳ <b>Timed out</b> — the exchange is slow right now, try again in a moment."
+    return f"❌ <b>Error:</b> {_escape_html(str(e))}"
+
+
+async def _analyze_raw(symbol: str, timeframe: str) -> dict:
+    """
+    analyze_coin_raw, given up on after ANALYZE_TIMEOUT_SECONDS.  The run
+    itself is shared and carries on, so a retry may find it cached.
+    """
+    return await asyncio.wait_for(analyze_coin_raw(symbol, timeframe),
+                                  timeout=config.ANALYZE_TIMEOUT_SECONDS)
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # Callback handler (button presses)
 # ═══════════════════════════════════════════════════════════════════════════
 
+async def _edit_or_send(query, text: str, **kwargs):
+    """
+    Edit the callback's message into text, or send it as a new message when
+    the edit fails (message too old or deleted, network error, …).  An
+    unchanged message is left as is.
+    """
+    try:
+        await query.edit_message_text(text, **kwargs)
+    except TelegramError as e:
+        if isinstance(e, BadRequest) and "not modified" in e.message.lower():
+            return
+        await query.message.chat.send_message(text, **kwargs)
+
+
 async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
 
     user_id = query.from_user.id
-    data = query.data
+    data = _CALLBACK_DECODE.get(query.data, query.data)
 
     # ── New analysis / More X → strip buttons off current msg, send fresh picker ──
     if data == "new_analysis" or (data.startswith("market_") and query.message.text and len(query.message.text) > 200):
@@ -283,35 +424,23 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         # Just remove the buttons so result stays clean
         try:
             await query.edit_message_reply_markup(reply_markup=None)
-        except Exception:
+        except TelegramError:
             pass
         # Send a fresh picker below
         if data == "new_analysis":
-            await query.message.chat.send_message("Select a market 👇", reply_markup=_market_keyboard(), parse_mode="HTML")
+            await query.message.chat.send_message("Select a market 👇", reply_markup=_MARKET_KEYBOARD, parse_mode="HTML")
         else:
             # It's a market_ button on an analysis, start the flow
             market = data.replace("market_", "")
-            user_data[user_id] = {"market": market}
-            symbols_map = {"crypto": CRYPTO_SYMBOLS, "forex": FOREX_SYMBOLS, "defi": DEFI_SYMBOLS}
-            symbols = symbols_map.get(market, CRYPTO_SYMBOLS)
-            title = {"crypto": "💰 Select Crypto:", "forex": "� Select Pair:", "defi": "🏦 Select DeFi:"}.get(market, "Select:")
-            keyboard = []
-            for i in range(0, len(symbols), 2):
-                row = [InlineKeyboardButton(_display_name(symbols[i], market), callback_data=f"sym_{symbols[i]}")]
-                if i + 1 < len(symbols):
-                    row.append(InlineKeyboardButton(_display_name(symbols[i + 1], market), callback_data=f"sym_{symbols[i + 1]}"))
-                keyboard.append(row)
-            keyboard.append([
-                InlineKeyboardButton("🔍 Custom", callback_data=f"custom_{market}"),
-                InlineKeyboardButton("⬅️ Back", callback_data="new_analysis"),
-            ])
-            await query.message.chat.send_message(title, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode="HTML")
+            user_data.set(user_id, {"market": market})
+            title = _MARKET_TITLES.get(market, "Select:")
+            await query.message.chat.send_message(title, reply_markup=_symbol_keyboard(market), parse_mode="HTML")
         return
 
     # ── Custom symbol request → ask user to type the symbol ──
     if data.startswith("custom_"):
         market = data.replace("custom_", "")
-        user_data[user_id] = {"market": market, "awaiting_custom": True}
+        user_data.set(user_id, {"market": market, "awaiting_custom": True})
         hint = {
             "crypto": "e.g. <b>PEPE</b>, <b>SHIB</b>, <b>WLD</b>, <b>ARB</b>",
             "forex": "e.g. <b>XAU</b>, <b>EUR</b>, <b>CHF</b>",
@@ -320,140 +449,113 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         back_kb = InlineKeyboardMarkup([
             [InlineKeyboardButton("⬅️ Back", callback_data=f"market_{market}")],
         ])
-        try:
-            await query.edit_message_text(
-                f"🔍 <b>Type a symbol</b>\n{hint}\n\n"
-                f"Just the base coin — I'll add /USDT automatically.",
-                parse_mode="HTML",
-                reply_markup=back_kb,
-            )
-        except Exception:
-            await query.message.chat.send_message(
-                f"🔍 <b>Type a symbol</b>\n{hint}\n\n"
-                f"Just the base coin — I'll add /USDT automatically.",
-                parse_mode="HTML",
-                reply_markup=back_kb,
-            )
+        await _edit_or_send(
+            query,
+            f"🔍 <b>Type a symbol</b>\n{hint}\n\n"
+            f"Just the base coin — I'll add /USDT automatically.",
+            parse_mode="HTML",
+            reply_markup=back_kb,
+        )
         return
 
     # ── Market selected (from picker, not from analysis) → edit in place ──
     if data.startswith("market_"):
         market = data.replace("market_", "")
-        user_data[user_id] = {"market": market}
-
-        symbols_map = {"crypto": CRYPTO_SYMBOLS, "forex": FOREX_SYMBOLS, "defi": DEFI_SYMBOLS}
-        symbols = symbols_map.get(market, CRYPTO_SYMBOLS)
-        title = {"crypto": "💰 Select Crypto:", "forex": "� Select Pair:", "defi": "🏦 Select DeFi:"}.get(market, "Select:")
-
-        keyboard = []
-        for i in range(0, len(symbols), 2):
-            row = [InlineKeyboardButton(_display_name(symbols[i], market), callback_data=f"sym_{symbols[i]}")]
-            if i + 1 < len(symbols):
-                row.append(InlineKeyboardButton(_display_name(symbols[i + 1], market), callback_data=f"sym_{symbols[i + 1]}"))
-            keyboard.append(row)
-        keyboard.append([
-            InlineKeyboardButton("🔍 Custom", callback_data=f"custom_{market}"),
-            InlineKeyboardButton("⬅️ Back", callback_data="new_analysis"),
-        ])
+        user_data.set(user_id, {"market": market})
 
-        try:
-            await query.edit_message_text(title, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode="HTML")
-        except Exception:
-            await query.message.chat.send_message(title, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode="HTML")
+        title = _MARKET_TITLES.get(market, "Select:")
+        keyboard = _symbol_keyboard(market)
+
+        await _edit_or_send(query, title, reply_markup=keyboard, parse_mode="HTML")
         return
 
     # ── Symbol selected → edit into timeframe picker ──
     if data.startswith("sym_"):
         symbol = data.replace("sym_", "")
-        if user_id not in user_data:
+        state = user_data.get(user_id)
+        if state is None:
             await query.message.chat.send_message("❌ Session expired. Use /start again.")
             return
-        user_data[user_id]["symbol"] = symbol
-        market = user_data[user_id]["market"]
+        state["symbol"] = symbol
+        market = state["market"]
 
-        keyboard = []
-        for i in range(0, len(TIMEFRAMES), 3):
-            row = [InlineKeyboardButton(tf, callback_data=f"tf_{tf}") for tf in TIMEFRAMES[i:i + 3]]
-            keyboard.append(row)
-        keyboard.append([InlineKeyboardButton("⬅️ Back", callback_data=f"market_{market}")])
+        keyboard = _tf_keyboard(market)
 
         dn = _display_name(symbol, market)
-        try:
-            await query.edit_message_text(f"<b>{dn}</b>  ·  pick a timeframe ⏱", reply_markup=InlineKeyboardMarkup(keyboard), parse_mode="HTML")
-        except Exception:
-            await query.message.chat.send_message(f"<b>{dn}</b>  ·  pick a timeframe ⏱", reply_markup=InlineKeyboardMarkup(keyboard), parse_mode="HTML")
+        await _edit_or_send(query, f"<b>{dn}</b>  ·  pick a timeframe ⏱", reply_markup=keyboard, parse_mode="HTML")
         return
 
     # ── Timeframe selected → edit into loading, then edit into result ──
     if data.startswith("tf_"):
         timeframe = data.replace("tf_", "")
-        if user_id not in user_data or "symbol" not in user_data.get(user_id, {}):
+        state = user_data.get(user_id)
+        if state is None or "symbol" not in state:
             await query.message.chat.send_message("❌ Session expired. Use /start again.")
             return
 
-        symbol = user_data[user_id]["symbol"]
-        market = user_data[user_id]["market"]
+        symbol = state["symbol"]
+        market = state["market"]
         dn = _display_name(symbol, market)
-        tg_user = query.from_user
 
         # Edit picker into loading state
         try:
             await query.edit_message_text(f"⏳ <b>{dn}</b> · {timeframe}  —  analyzing…", parse_mode="HTML")
-        except Exception:
+        except TelegramError:
             pass
 
-        t0 = time.time()
-        try:
-            raw_data = await analyze_coin_raw(symbol, timeframe)
-            result = _format_raw(raw_data)
-            elapsed = int((time.time() - t0) * 1000)
+        # The analysis runs as its own task, so this handler returns right
+        # away and other users' updates are not queued behind the exchange
+        user_data.pop(user_id)
+        context.application.create_task(
+            _analyze_for_callback(query, symbol, timeframe, market), update=update)
 
-            # Log to Supabase
-            await analytics.async_log_analysis(
-                user_id=tg_user.id, username=tg_user.username, first_name=tg_user.first_name,
-                symbol=symbol, timeframe=timeframe, source="telegram_button",
-                signal=raw_data.get("signal"), indicators=raw_data.get("indicators"),
-                levels=raw_data.get("levels"), trend=raw_data.get("trend"),
-                flow=raw_data.get("flow"), scenarios=raw_data.get("scenarios"),
-                response_time_ms=elapsed,
-            )
 
-            nav_keyboard = InlineKeyboardMarkup([
-                [InlineKeyboardButton("🔄 New Analysis", callback_data="new_analysis")],
-                [InlineKeyboardButton(f"💰 More {market.title()}", callback_data=f"market_{market}")],
-            ])
-
-            if len(result) <= 4096:
-                try:
-                    await query.edit_message_text(result, parse_mode="HTML", reply_markup=nav_keyboard)
-                except Exception:
-                    await query.message.chat.send_message(result, parse_mode="HTML", reply_markup=nav_keyboard)
-            else:
-                chunks = _smart_chunk(result, 4096)
-                try:
-                    await query.message.delete()
-                except Exception:
-                    pass
-                for i, chunk in enumerate(chunks):
-                    rm = nav_keyboard if i == len(chunks) - 1 else None
-                    await query.message.chat.send_message(chunk, parse_mode="HTML", reply_markup=rm)
+async def _analyze_for_callback(query, symbol: str, timeframe: str, market: str):
+    """Run a picker-flow analysis and edit the loading message into the result."""
+    tg_user = query.from_user
+    t0 = time.time()
+    try:
+        raw_data = await _analyze_raw(symbol, timeframe)
+        result = _format_raw(raw_data)
+        elapsed = int((time.time() - t0) * 1000)
+    except Exception as e:
+        logger.exception("Analysis error for %s", symbol)
+        await analytics.async_log_error(
+            error_type="analysis_error", details=str(e) or type(e).__name__,
+            telegram_id=tg_user.id, symbol=symbol, timeframe=timeframe,
+        )
+        kb = InlineKeyboardMarkup([
+            [InlineKeyboardButton("🔄 Try Again", callback_data="new_analysis")],
+            [InlineKeyboardButton("⬅️ Back", callback_data=f"market_{market}")],
+        ])
+        try:
+            await _edit_or_send(query, _error_text(e), parse_mode="HTML", reply_markup=kb)
+        except TelegramError:
+            logger.exception("Could not report the error for %s", symbol)
+        return
 
-        except Exception as e:
-            logger.exception("Analysis error for %s", symbol)
-            await analytics.async_log_error(
-                error_type="analysis_error", details=str(e),
-                telegram_id=tg_user.id, symbol=symbol, timeframe=timeframe,
-            )
-            kb = InlineKeyboardMarkup([
-                [InlineKeyboardButton("🔄 Try Again", callback_data="new_analysis")],
-                [InlineKeyboardButton("⬅️ Back", callback_data=f"market_{market}")],
-            ])
-            try:
-                await query.edit_message_text(f"❌ <b>Error:</b> {_escape_html(str(e))}", parse_mode="HTML", reply_markup=kb)
-            except Exception:
-                await query.message.chat.send_message(f"❌ <b>Error:</b> {_escape_html(str(e))}", parse_mode="HTML", reply_markup=kb)
+    # Log to Supabase
+    await analytics.async_log_analysis(
+        user_id=tg_user.id, username=tg_user.username, first_name=tg_user.first_name,
+        symbol=symbol, timeframe=timeframe, source="telegram_button",
+        signal=raw_data.get("signal"), indicators=raw_data.get("indicators"),
+        levels=raw_data.get("levels"), trend=raw_data.get("trend"),
+        flow=raw_data.get("flow"), scenarios=raw_data.get("scenarios"),
+        response_time_ms=elapsed,
+    )
 
-        user_data.pop(user_id, None)
+    # Delivery failures are not analysis errors
+    try:
+        if len(result) <= 4096:
+            await _edit_or_send(query, result, parse_mode="HTML", reply_markup=_nav_keyboard(market))
+        else:
+            try:
+                await query.message.delete()
+            except TelegramError:
+                pass
+            await _send_analysis_to_chat(query.message.chat, result, symbol, market)
+    except TelegramError:
+        logger.exception("Could not send the analysis for %s", symbol)
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -468,29 +570,20 @@ async def text_message_handler(update: Update, context: ContextTypes.DEFAULT_TYP
     if not state or not state.get("awaiting_custom"):
         return  # Not waiting for custom input — ignore
 
-    raw = update.message.text.strip().upper()
-    if not raw or len(raw) > 20:
+    symbol = _normalize_symbol(update.message.text)
+    if symbol is None:
         await update.message.reply_text("❌ Invalid symbol. Try again (e.g. <b>PEPE</b>)", parse_mode="HTML")
         return
 
-    # Normalize to SYMBOL/USDT
-    raw = raw.replace("$", "").replace(" ", "")
-    if raw.endswith("/USDT"):
-        symbol = raw
-    elif raw.endswith("USDT"):
-        symbol = raw[:-4] + "/USDT"
-    else:
-        symbol = f"{raw}/USDT"
-
     market = state["market"]
 
     # ── Validate symbol exists on Binance ──
     try:
-        client = MultiExchangeClient()
-        await client._ensure_markets()
-        if symbol not in client.binance.markets:
+        # Shared client: markets are loaded once (or from disk), then this
+        # is a set lookup
+        if not await get_client().has_symbol(symbol):
             await update.message.reply_text(
-                f"❌ <b>{raw}</b> not found on Binance.\n"
+                f"❌ <b>{_escape_html(symbol)}</b> not found on Binance.\n"
                 f"Check spelling and try again (e.g. <b>PEPE</b>, <b>ARB</b>)",
                 parse_mode="HTML",
             )
@@ -498,18 +591,12 @@ async def text_message_handler(update: Update, context: ContextTypes.DEFAULT_TYP
     except Exception:
         pass  # Skip validation if exchange unreachable — let analysis handle it
 
-    user_data[user_id] = {"market": market, "symbol": symbol}
-
-    keyboard = []
-    for i in range(0, len(TIMEFRAMES), 3):
-        row = [InlineKeyboardButton(tf, callback_data=f"tf_{tf}") for tf in TIMEFRAMES[i:i + 3]]
-        keyboard.append(row)
-    keyboard.append([InlineKeyboardButton("⬅️ Back", callback_data=f"market_{market}")])
+    user_data.set(user_id, {"market": market, "symbol": symbol})
 
     dn = _display_name(symbol, market)
     await update.message.reply_text(
         f"<b>{dn}</b>  ·  pick a timeframe ⏱",
-        reply_markup=InlineKeyboardMarkup(keyboard),
+        reply_markup=_tf_keyboard(market),
         parse_mode="HTML",
     )
 
@@ -522,40 +609,33 @@ async def text_message_handler(update: Update, context: ContextTypes.DEFAULT_TYP
 # Health-check server (keeps Render free tier happy)
 # ═══════════════════════════════════════════════════════════════════════════
 
-class _HealthHandler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        self.send_response(200)
-        self.send_header("Content-Type", "text/plain")
-        self.end_headers()
-        self.wfile.write(b"OK")
+async def _health(request: web.Request) -> web.Response:
+    return web.Response(text="OK")
 
-    def do_HEAD(self):
-        self.send_response(200)
-        self.send_header("Content-Type", "text/plain")
-        self.end_headers()
 
-    def log_message(self, *args):
-        pass  # Silence health-check logs
+async def _start_health_server() -> web.AppRunner:
+    """
+    Answer GET / HEAD on any path of PORT with OK, from the bot's own event
+    loop, so a stuck loop also fails the health check.
+    """
+    port = int(os.environ.get("PORT", 8000))
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", _health)
+    runner = web.AppRunner(app, access_log=None)  # Silence health-check logs
+    await runner.setup()
+    await web.TCPSite(runner, "0.0.0.0", port).start()
+    logger.info("Health server listening on port %d", port)
+    return runner
 
 
-def _run_health_server(port: int):
-    """Run the health server with automatic restart on failure."""
+async def _refresh_markets_periodically():
+    """Keep the exchange market list (and its disk copy) current."""
     while True:
+        await asyncio.sleep(config.MARKETS_CACHE_TTL_SECONDS)
         try:
-            server = HTTPServer(("0.0.0.0", port), _HealthHandler)
-            logger.info("Health server listening on port %d", port)
-            server.serve_forever()
-        except Exception:
-            logger.exception("Health server crashed — restarting in 5s")
-            import time
-            time.sleep(5)
-
-
-def _start_health_server():
-    port = int(os.environ.get("PORT", 8000))
-    thread = threading.Thread(target=_run_health_server, args=(port,), daemon=True)
-    thread.start()
-    logger.info("Health server started on port %d", port)
+            await get_client().refresh_markets()
+        except Exception as e:
+            logger.warning("Markets refresh failed: %s", e)
 
 
 def main(skip_health_server: bool = False):
@@ -565,19 +645,51 @@ def main(skip_health_server: bool = False):
         print("ERROR: Set TELEGRAM_BOT_TOKEN in your .env file.")
         return
 
-    # Start health-check server for Render (only if not started by run.py)
-    if not skip_health_server:
-        _start_health_server()
+    # libuv-based event loop when available (not on Windows); run_polling
+    # creates its loop through the installed policy
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
 
     async def post_init(app):
         """Called after the Application is fully initialized and the event loop is running."""
+        # Health-check server for Render (only if not started by run.py)
+        if not skip_health_server:
+            app.bot_data["health_runner"] = await _start_health_server()
         asyncio.create_task(analytics.check_signal_accuracy())
         logger.info("Accuracy checker background task started.")
-
+        # Markets are loaded now rather than on the first request
+        asyncio.create_task(
+            get_client().warmup(config.HOT_SYMBOLS, config.HOT_TIMEFRAMES))
+        asyncio.create_task(_refresh_markets_periodically())
+
+    async def post_shutdown(app):
+        runner = app.bot_data.get("health_runner")
+        if runner is not None:
+            await runner.cleanup()
+
+    # Bot API calls share a large HTTP/2 pool (many edits / sends multiplexed
+    # over one connection); getUpdates long-polls on its own small pool.
+    # Updates are dispatched concurrently; MAX_CONCURRENT_ANALYSES still
+    # bounds the exchange work behind them.
     application = (
         Application.builder()
         .token(TELEGRAM_BOT_TOKEN)
+        .request(HTTPXRequest(
+            connection_pool_size=config.TELEGRAM_POOL_SIZE,
+            pool_timeout=config.TELEGRAM_POOL_TIMEOUT,
+            http_version=config.TELEGRAM_HTTP_VERSION,
+        ))
+        .get_updates_request(HTTPXRequest(
+            connection_pool_size=2,
+            pool_timeout=config.TELEGRAM_POOL_TIMEOUT,
+            http_version=config.TELEGRAM_HTTP_VERSION,
+        ))
+        .concurrent_updates(config.TELEGRAM_CONCURRENT_UPDATES)
         .post_init(post_init)
+        .post_shutdown(post_shutdown)
         .build()
     )
 